@@ -0,0 +1,32 @@
+import json
+from functools import lru_cache
+from typing import Any
+from fastapi import Response
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def _type_adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def model_response(annotation: Any, content: Any, **kwargs) -> FastJSONResponse:
+    # Возвращенный Response FastAPI отдает как есть: без jsonable_encoder и повторной проверки
+    # по response_model. Поэтому content должен быть уже проверен - моделями или model_construct.
+    return FastJSONResponse(_type_adapter(annotation).dump_json(content), **kwargs)
@@ -0,0 +1,58 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, literal, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError(cursor)
+        return [convert(value) for convert, value in zip(types, values)]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор пагинации",
+        )
+
+
+def paginate_by_id(query: Select, id_column, cursor: Optional[str], skip: int, limit: int) -> Select:
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.where(id_column > last_id)
+    else:
+        query = query.offset(skip)
+    return query.order_by(id_column).limit(limit)
+
+
+def paginate_by_time_desc(
+    query: Select, time_column, id_column, cursor: Optional[str], skip: int, limit: int
+) -> Select:
+    if cursor:
+        last_time, last_id = decode_cursor(cursor, datetime.fromisoformat, int)
+        query = query.where(
+            tuple_(time_column, id_column) < tuple_(literal(last_time, time_column.type), last_id)
+        )
+    else:
+        query = query.offset(skip)
+    return query.order_by(time_column.desc(), id_column.desc()).limit(limit)
+
+
+def set_next_cursor(response: Response, items: Sequence[Any], limit: int, key: Callable[[Any], tuple]):
+    if items and len(items) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(items[-1]))
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
+from app.core.database import get_db
+from app.api.dependencies import get_current_user
+from app.models.user import User
+from app.schemas.analytics import SentEmailTimeSeriesResponse
+from app.services.analytics_service import SentEmailRollupService, to_utc
+
+router = APIRouter()
+
+BUCKET_SIZES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+DEFAULT_RANGES = {"hour": timedelta(hours=48), "day": timedelta(days=30)}
+
+
+@router.get(
+    "/sent-emails/timeseries",
+    summary="Временные ряды автоответов по часам или дням (пользователи видят только свои данные)",
+    tags=["Аналитика"],
+    response_model=SentEmailTimeSeriesResponse,
+)
+async def get_sent_emails_time_series(
+    granularity: Literal["hour", "day"] = "day",
+    group_by: Literal["none", "user", "template"] = "none",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    response_template_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    if not current_user.is_superuser:
+        if user_id is not None and user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="У вас нет прав для просмотра статистики других пользователей",
+            )
+        user_id = current_user.id
+    
+    end = to_utc(end) if end else datetime.now(timezone.utc)
+    start = to_utc(start) if start else end - DEFAULT_RANGES[granularity]
+    
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Начало периода должно быть раньше конца",
+        )
+    
+    if (end - start) / BUCKET_SIZES[granularity] > settings.ANALYTICS_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Слишком большой период: не более {settings.ANALYTICS_MAX_BUCKETS} интервалов",
+        )
+    
+    series = await db.run_sync(
+        lambda session: SentEmailRollupService(session).get_time_series(
+            granularity=granularity,
+            start=start,
+            end=end,
+            group_by=group_by,
+            user_id=user_id,
+            response_template_id=response_template_id,
+        )
+    )
+    
+    return SentEmailTimeSeriesResponse(
+        granularity=granularity,
+        group_by=group_by,
+        start=start,
+        end=end,
+        series=series,
+    )
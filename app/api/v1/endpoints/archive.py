@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends
+from typing import List, Optional
+from datetime import datetime
+from app.api.dependencies import get_current_active_superuser
+from app.models.user import User
+from app.schemas.response_template import EmailResponseAttachmentResponse
+from app.schemas.sent_email import SentEmailResponse
+from app.services.retention_service import ATTACHMENTS_ARCHIVE, SENT_EMAILS_ARCHIVE, read_archive
+
+router = APIRouter()
+
+
+@router.get(
+    "/sent-emails",
+    summary="Получить архив отправленных email. Доступно только для админа",
+    tags=["Команды админа"],
+    response_model=List[SentEmailResponse],
+)
+def get_archived_sent_emails(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    current_superuser: User = Depends(get_current_active_superuser),
+):
+    return read_archive(SENT_EMAILS_ARCHIVE, "sent_at", start, end, user_id, skip, limit)
+
+
+@router.get(
+    "/attachments",
+    summary="Получить архив связей письмо-ответ. Доступно только для админа",
+    tags=["Команды админа"],
+    response_model=List[EmailResponseAttachmentResponse],
+)
+def get_archived_attachments(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    current_superuser: User = Depends(get_current_active_superuser),
+):
+    return read_archive(ATTACHMENTS_ARCHIVE, "attached_at", start, end, user_id, skip, limit)
@@ -1,16 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.security import (
-    verify_password, 
-    get_password_hash, 
+    verify_and_update_password,
+    get_password_hash_async,
     create_access_token,
     encrypt_email_password
 )
 from app.models.user import User
-from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
+from app.schemas.user import UserCreate, UserLogin, UserResponse, Token, RefreshTokenRequest
 from app.api.dependencies import get_current_active_superuser
+from app.services.principal_cache import principal_cache
+from app.services.refresh_token_service import RefreshTokenService
 
 router = APIRouter()
 
@@ -24,13 +27,11 @@ router = APIRouter()
 )
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_superuser: User = Depends(get_current_active_superuser),
 ):
-    existing_user = (
-        db.query(User)
-        .filter((User.email == user_data.email) | (User.username == user_data.username))
-        .first()
+    existing_user = await db.scalar(
+        select(User).where((User.email == user_data.email) | (User.username == user_data.username))
     )
     if existing_user:
         raise HTTPException(
@@ -38,7 +39,7 @@ async def register(
             detail="User with this email or username already exists",
         )
 
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     encrypted_email_password = encrypt_email_password(user_data.email_password) if user_data.email_password else None
     new_user = User(
         email=user_data.email,
@@ -48,8 +49,8 @@ async def register(
         email_password=encrypted_email_password,
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
@@ -61,10 +62,13 @@ async def register(
 )
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await db.scalar(select(User).where(User.username == form_data.username))
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -74,5 +78,49 @@ async def login(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
         )
+    if new_hash:
+        # Хэш создан с другой стоимостью bcrypt: пересчитываем, пока пароль известен.
+        user.hashed_password = new_hash
+    refresh_token = RefreshTokenService(db).issue(user.id)
+    await db.commit()
+    if new_hash:
+        principal_cache.invalidate(user.username)
     access_token = create_access_token(data={"sub": user.username})
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+@router.post(
+    "/refresh",
+    summary="Обновить токен доступа по refresh-токену.\n Доступно для всех пользователей",
+    tags=["Общедоступные команды", "Вход"],
+    response_model=Token,
+)
+async def refresh(
+    token_data: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    rotated = await RefreshTokenService(db).rotate(token_data.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user, refresh_token = rotated
+    access_token = create_access_token(data={"sub": user.username})
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+@router.post(
+    "/logout",
+    summary="Выйти: отозвать refresh-токен.\n Доступно для всех пользователей",
+    tags=["Общедоступные команды", "Вход"],
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def logout(
+    token_data: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    await RefreshTokenService(db).revoke(token_data.refresh_token)
+    await db.commit()
+    return None
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from app.core.database import get_db
 from app.api.dependencies import get_current_user
+from app.api.json_response import model_response
 from app.models.user import User
 from app.core.security import decrypt_email_password
 from app.services.email_service import EmailService
@@ -26,7 +28,7 @@ router = APIRouter()
 async def test_email_connection(
     connection_data: Optional[EmailConnectionTest] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if connection_data and connection_data.email and connection_data.email_password:
         email_address = connection_data.email
@@ -57,7 +59,7 @@ async def test_email_connection(
             imap_port=imap_port,
         )
         
-        success, message, details = email_service.test_connection()
+        success, message, details = await run_in_threadpool(email_service.test_connection)
         
         return EmailConnectionResponse(
             success=success,
@@ -82,7 +84,7 @@ async def test_email_connection(
 async def fetch_emails(
     fetch_request: EmailFetchRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if not current_user.email_password:
         raise HTTPException(
@@ -105,7 +107,7 @@ async def fetch_emails(
             imap_port=993,
         )
         
-        success, message = email_service.connect()
+        success, message = await run_in_threadpool(email_service.connect)
         if not success:
             return EmailFetchResponse(
                 success=False,
@@ -115,21 +117,25 @@ async def fetch_emails(
             )
         
         try:
-            emails = email_service.fetch_emails(
+            emails = await run_in_threadpool(
+                email_service.fetch_emails,
                 folder=fetch_request.folder,
                 limit=fetch_request.limit,
                 search_criteria=fetch_request.search_criteria,
                 include_body=fetch_request.include_body,
             )
             
-            return EmailFetchResponse(
-                success=True,
-                message=f"Успешно получены {len(emails)} emails",
-                total_count=len(emails),
-                emails=emails,
+            return model_response(
+                EmailFetchResponse,
+                EmailFetchResponse.model_construct(
+                    success=True,
+                    message=f"Успешно получены {len(emails)} emails",
+                    total_count=len(emails),
+                    emails=[email.to_schema() for email in emails],
+                ),
             )
         finally:
-            email_service.disconnect()
+            await run_in_threadpool(email_service.disconnect)
             
     except Exception as e:
         raise HTTPException(
@@ -146,7 +152,7 @@ async def fetch_emails(
 )
 async def get_email_folders(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if not current_user.email_password:
         raise HTTPException(
@@ -169,7 +175,7 @@ async def get_email_folders(
             imap_port=993,
         )
         
-        success, message = email_service.connect()
+        success, message = await run_in_threadpool(email_service.connect)
         if not success:
             return EmailFoldersResponse(
                 success=False,
@@ -177,13 +183,13 @@ async def get_email_folders(
             )
         
         try:
-            folders = email_service.list_folders()
+            folders = await run_in_threadpool(email_service.list_folders)
             return EmailFoldersResponse(
                 success=True,
                 folders=folders,
             )
         finally:
-            email_service.disconnect()
+            await run_in_threadpool(email_service.disconnect)
             
     except Exception as e:
         raise HTTPException(
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 from app.core.database import get_db
+from app.api.conditional import is_not_modified, not_modified, set_etag, weak_etag
+from app.api.json_response import model_response
+from app.api.pagination import paginate_by_id, paginate_by_time_desc, set_next_cursor
 from app.api.dependencies import get_current_user
 from app.models.user import User
 from app.models.response_template import ResponseTemplate, EmailResponseAttachment
-from app.models.sent_email import SentEmail
+from app.models.sent_email import SentEmail, SentEmailCounter, sent_email_counter_seed
 from app.schemas.response_template import (
     ResponseTemplateCreate,
     ResponseTemplateUpdate,
@@ -17,9 +22,19 @@ from app.schemas.response_template import (
 )
 from app.schemas.sent_email import SentEmailResponse, SentEmailStats
 from app.services.smtp_service import SMTPService
+from app.services.template_cache import response_template_cache
 
 router = APIRouter()
 
+ATTACHMENT_LOAD_OPTIONS = (joinedload(EmailResponseAttachment.response_template), raiseload("*"))
+SENT_EMAIL_LOAD_OPTIONS = (selectinload(SentEmail.stored_body), raiseload("*"))
+
+
+async def _rebuild_sent_email_counter(db: AsyncSession, user_id: int) -> SentEmailCounter:
+    await db.execute(sent_email_counter_seed(db.get_bind().dialect.name, user_id))
+    await db.commit()
+    return (await db.scalars(select(SentEmailCounter).where(SentEmailCounter.user_id == user_id))).one()
+
 
 @router.post(
     "/response/create",
@@ -31,7 +46,7 @@ router = APIRouter()
 async def create_response_template(
     template_data: ResponseTemplateCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     new_template = ResponseTemplate(
         user_id=current_user.id,
@@ -41,8 +56,9 @@ async def create_response_template(
     )
     
     db.add(new_template)
-    db.commit()
-    db.refresh(new_template)
+    await db.commit()
+    await db.refresh(new_template)
+    response_template_cache.invalidate(new_template.id)
     
     return new_template
 
@@ -54,19 +70,29 @@ async def create_response_template(
     response_model=List[ResponseTemplateResponse],
 )
 async def get_all_response_templates(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    templates = (
-        db.query(ResponseTemplate)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
-    
-    return templates
+    async def load_page():
+        query = select(ResponseTemplate).options(raiseload("*"))
+        return (await db.scalars(paginate_by_id(query, ResponseTemplate.id, cursor, skip, limit))).all()
+    
+    page = await response_template_cache.get_page((cursor, skip, limit), load_page)
+    
+    etag = weak_etag("response_templates", page.version)
+    if is_not_modified(request, etag):
+        response = not_modified(etag)
+        set_next_cursor(response, page.items, limit, lambda template: (template.id,))
+        return response
+    
+    response = model_response(List[ResponseTemplateResponse], page.items)
+    set_etag(response, etag)
+    set_next_cursor(response, page.items, limit, lambda template: (template.id,))
+    return response
 
 
 @router.get(
@@ -78,9 +104,9 @@ async def get_all_response_templates(
 async def get_response_template(
     template_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    template = db.query(ResponseTemplate).filter(ResponseTemplate.id == template_id).first()
+    template = await response_template_cache.get(db, template_id)
     
     if not template:
         raise HTTPException(
@@ -101,9 +127,9 @@ async def update_response_template(
     template_id: int,
     template_data: ResponseTemplateUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    template = db.query(ResponseTemplate).filter(ResponseTemplate.id == template_id).first()
+    template = await db.scalar(select(ResponseTemplate).where(ResponseTemplate.id == template_id))
     
     if not template:
         raise HTTPException(
@@ -126,8 +152,9 @@ async def update_response_template(
     if template_data.send_response is not None:
         template.send_response = template_data.send_response
     
-    db.commit()
-    db.refresh(template)
+    await db.commit()
+    await db.refresh(template)
+    response_template_cache.invalidate(template_id)
     
     return template
 
@@ -141,9 +168,9 @@ async def update_response_template(
 async def delete_response_template(
     template_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    template = db.query(ResponseTemplate).filter(ResponseTemplate.id == template_id).first()
+    template = await db.scalar(select(ResponseTemplate).where(ResponseTemplate.id == template_id))
     
     if not template:
         raise HTTPException(
@@ -157,12 +184,15 @@ async def delete_response_template(
             detail="У вас нет прав для удаления этого шаблона",
         )
     
-    db.query(EmailResponseAttachment).filter(
-        EmailResponseAttachment.response_template_id == template_id
-    ).delete()
+    await db.execute(
+        delete(EmailResponseAttachment).where(
+            EmailResponseAttachment.response_template_id == template_id
+        )
+    )
     
-    db.delete(template)
-    db.commit()
+    await db.delete(template)
+    await db.commit()
+    response_template_cache.invalidate(template_id)
     
     return None
 
@@ -177,11 +207,9 @@ async def delete_response_template(
 async def attach_response_to_email(
     attachment_data: EmailResponseAttachmentCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    template = db.query(ResponseTemplate).filter(
-        ResponseTemplate.id == attachment_data.response_template_id
-    ).first()
+    template = await response_template_cache.get(db, attachment_data.response_template_id)
     
     if not template:
         raise HTTPException(
@@ -189,14 +217,12 @@ async def attach_response_to_email(
             detail="Шаблон ответа не найден",
         )
     
-    existing = (
-        db.query(EmailResponseAttachment)
-        .filter(
+    existing = await db.scalar(
+        select(EmailResponseAttachment).where(
             EmailResponseAttachment.user_id == current_user.id,
             EmailResponseAttachment.email_uid == attachment_data.email_uid,
             EmailResponseAttachment.response_template_id == attachment_data.response_template_id
         )
-        .first()
     )
     
     if existing:
@@ -215,8 +241,13 @@ async def attach_response_to_email(
     )
     
     db.add(attachment)
-    db.commit()
-    db.refresh(attachment)
+    await db.commit()
+    await db.refresh(attachment, ["attached_at"])
+    
+    if template.send_response:
+        # По шаблону письмо уходит клиенту, а кэш воркера может быть устаревшим: тема и текст
+        # перечитываются из базы. Прикрепление без отправки обходится кэшем.
+        template = await response_template_cache.get_current(db, template.id) or template
     
     if template.send_response:
         recipient_email = attachment_data.email_from
@@ -235,10 +266,11 @@ async def attach_response_to_email(
                 response_template_id=template.id
             )
             db.add(sent_email)
-            db.commit()
+            await db.commit()
         else:
             smtp_service = SMTPService()
-            success, message = smtp_service.send_email(
+            success, message = await run_in_threadpool(
+                smtp_service.send_email,
                 to_email=recipient_email,
                 subject=template.title,
                 body=template.body,
@@ -261,9 +293,19 @@ async def attach_response_to_email(
             )
             
             db.add(sent_email)
-            db.commit()
-    
-    return attachment
+            await db.commit()
+    
+    return EmailResponseAttachmentResponse(
+        id=attachment.id,
+        user_id=attachment.user_id,
+        email_uid=attachment.email_uid,
+        email_subject=attachment.email_subject,
+        email_from=attachment.email_from,
+        response_template_id=attachment.response_template_id,
+        attached_at=attachment.attached_at,
+        notes=attachment.notes,
+        response_template=template,
+    )
 
 
 @router.get(
@@ -275,13 +317,15 @@ async def attach_response_to_email(
 async def get_email_attachments(
     email_uid: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     attachments = (
-        db.query(EmailResponseAttachment)
-        .filter(EmailResponseAttachment.email_uid == email_uid)
-        .all()
-    )
+        await db.scalars(
+            select(EmailResponseAttachment)
+            .options(*ATTACHMENT_LOAD_OPTIONS)
+            .where(EmailResponseAttachment.email_uid == email_uid)
+        )
+    ).all()
     
     return attachments
 
@@ -295,9 +339,9 @@ async def get_email_attachments(
 async def get_template_attachments(
     template_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    template = db.query(ResponseTemplate).filter(ResponseTemplate.id == template_id).first()
+    template = await response_template_cache.get(db, template_id)
     
     if not template:
         raise HTTPException(
@@ -306,14 +350,15 @@ async def get_template_attachments(
         )
     
     attachments = (
-        db.query(EmailResponseAttachment)
-        .filter(EmailResponseAttachment.response_template_id == template_id)
-        .all()
-    )
+        await db.scalars(
+            select(EmailResponseAttachment)
+            .options(raiseload("*"))
+            .where(EmailResponseAttachment.response_template_id == template_id)
+        )
+    ).all()
     
-    result = []
-    for attachment in attachments:
-        result.append(EmailWithAttachedResponse(
+    return [
+        EmailWithAttachedResponse(
             email_uid=attachment.email_uid,
             email_subject=attachment.email_subject,
             email_from=attachment.email_from,
@@ -321,9 +366,9 @@ async def get_template_attachments(
             attached_at=attachment.attached_at,
             notes=attachment.notes,
             response_template=template,
-        ))
-    
-    return result
+        )
+        for attachment in attachments
+    ]
 
 
 @router.delete(
@@ -335,12 +380,10 @@ async def get_template_attachments(
 async def delete_email_attachment(
     attachment_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    attachment = (
-        db.query(EmailResponseAttachment)
-        .filter(EmailResponseAttachment.id == attachment_id)
-        .first()
+    attachment = await db.scalar(
+        select(EmailResponseAttachment).where(EmailResponseAttachment.id == attachment_id)
     )
     
     if not attachment:
@@ -349,8 +392,8 @@ async def delete_email_attachment(
             detail="Связь не найдена",
         )
     
-    db.delete(attachment)
-    db.commit()
+    await db.delete(attachment)
+    await db.commit()
     
     return None
 
@@ -362,18 +405,21 @@ async def delete_email_attachment(
     response_model=List[EmailResponseAttachmentResponse],
 )
 async def get_all_attachments(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
+    query = select(EmailResponseAttachment).options(*ATTACHMENT_LOAD_OPTIONS)
     attachments = (
-        db.query(EmailResponseAttachment)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+        await db.scalars(
+            paginate_by_id(query, EmailResponseAttachment.id, cursor, skip, limit)
+        )
+    ).all()
     
+    set_next_cursor(response, attachments, limit, lambda attachment: (attachment.id,))
     return attachments
 
 
@@ -386,18 +432,27 @@ async def get_all_attachments(
 async def get_sent_emails(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     success_only: bool = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    query = db.query(SentEmail).filter(SentEmail.user_id == current_user.id)
+    query = select(SentEmail).options(*SENT_EMAIL_LOAD_OPTIONS).where(SentEmail.user_id == current_user.id)
     
     if success_only is not None:
-        query = query.filter(SentEmail.success == success_only)
+        query = query.where(SentEmail.success == success_only)
     
-    sent_emails = query.order_by(SentEmail.sent_at.desc()).offset(skip).limit(limit).all()
+    sent_emails = (
+        await db.scalars(
+            paginate_by_time_desc(query, SentEmail.sent_at, SentEmail.id, cursor, skip, limit)
+        )
+    ).all()
     
-    return sent_emails
+    response = model_response(
+        List[SentEmailResponse], [SentEmailResponse.model_validate(sent_email) for sent_email in sent_emails]
+    )
+    set_next_cursor(response, sent_emails, limit, lambda sent_email: (sent_email.sent_at, sent_email.id))
+    return response
 
 
 @router.get(
@@ -407,33 +462,39 @@ async def get_sent_emails(
     response_model=SentEmailStats,
 )
 async def get_sent_emails_stats(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    total_sent = db.query(SentEmail).filter(SentEmail.user_id == current_user.id).count()
+    counter = await db.scalar(
+        select(SentEmailCounter).where(SentEmailCounter.user_id == current_user.id)
+    )
     
-    successful = db.query(SentEmail).filter(
-        SentEmail.user_id == current_user.id,
-        SentEmail.success == True
-    ).count()
+    if counter is None:
+        counter = await _rebuild_sent_email_counter(db, current_user.id)
     
-    failed = db.query(SentEmail).filter(
-        SentEmail.user_id == current_user.id,
-        SentEmail.success == False
-    ).count()
+    etag = weak_etag(
+        "sent_email_stats", counter.user_id, counter.total_sent, counter.successful, counter.failed, counter.updated_at
+    )
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     
     recent_emails = (
-        db.query(SentEmail)
-        .filter(SentEmail.user_id == current_user.id)
-        .order_by(SentEmail.sent_at.desc())
-        .limit(10)
-        .all()
-    )
+        await db.scalars(
+            select(SentEmail)
+            .options(*SENT_EMAIL_LOAD_OPTIONS)
+            .where(SentEmail.user_id == current_user.id)
+            .order_by(SentEmail.sent_at.desc(), SentEmail.id.desc())
+            .limit(10)
+        )
+    ).all()
     
     return SentEmailStats(
-        total_sent=total_sent,
-        successful=successful,
-        failed=failed,
+        total_sent=counter.total_sent,
+        successful=counter.successful,
+        failed=counter.failed,
         recent_emails=recent_emails
     )
 
@@ -447,15 +508,13 @@ async def get_sent_emails_stats(
 async def get_sent_email(
     sent_email_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    sent_email = (
-        db.query(SentEmail)
-        .filter(
+    sent_email = await db.scalar(
+        select(SentEmail).options(*SENT_EMAIL_LOAD_OPTIONS).where(
             SentEmail.id == sent_email_id,
             SentEmail.user_id == current_user.id
         )
-        .first()
     )
     
     if not sent_email:
@@ -476,7 +535,7 @@ async def test_smtp_connection(
     current_user: User = Depends(get_current_user),
 ):
     smtp_service = SMTPService()
-    success, message = smtp_service.test_connection()
+    success, message = await run_in_threadpool(smtp_service.test_connection)
     
     return {
         "success": success,
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from app.core.database import get_db
+from app.api.conditional import is_not_modified, not_modified, set_etag, weak_etag
+from app.api.pagination import paginate_by_id, set_next_cursor
 from app.api.dependencies import get_current_user, get_current_active_superuser
-from app.core.security import get_password_hash, encrypt_email_password, decrypt_email_password
+from app.core.security import get_password_hash_async, encrypt_email_password, decrypt_email_password
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
+from app.services.principal_cache import principal_cache
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.template_cache import response_template_cache
 
 router = APIRouter()
 
@@ -16,7 +22,15 @@ router = APIRouter()
     tags=["Профиль пользователя"],
     response_model=UserResponse,
 )
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+):
+    etag = weak_etag("me", *(getattr(current_user, field) for field in UserResponse.model_fields))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return current_user
 
 
@@ -27,12 +41,15 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     response_model=List[UserResponse],
 )
 async def get_all_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
     current_superuser: User = Depends(get_current_active_superuser),
 ):
-    users = db.query(User).offset(skip).limit(limit).all()
+    users = (await db.scalars(paginate_by_id(select(User), User.id, cursor, skip, limit))).all()
+    set_next_cursor(response, users, limit, lambda user: (user.id,))
     return users
 
 
@@ -44,10 +61,10 @@ async def get_all_users(
 )
 async def get_user_by_id(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_superuser: User = Depends(get_current_active_superuser),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -63,10 +80,10 @@ async def get_user_by_id(
 )
 async def deactivate_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_superuser: User = Depends(get_current_active_superuser),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -78,8 +95,9 @@ async def deactivate_user(
         )
 
     user.is_active = False
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    principal_cache.invalidate(user.username)
+    await db.refresh(user)
     return user
 
 
@@ -91,18 +109,19 @@ async def deactivate_user(
 )
 async def activate_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_superuser: User = Depends(get_current_active_superuser),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
     user.is_active = True
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    principal_cache.invalidate(user.username)
+    await db.refresh(user)
     return user
 
 
@@ -115,17 +134,18 @@ async def activate_user(
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_superuser: User = Depends(get_current_active_superuser),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
+    cached_username = user.username
 
     if user_data.email and user_data.email != user.email:
-        existing = db.query(User).filter(User.email == user_data.email).first()
+        existing = await db.scalar(select(User).where(User.email == user_data.email))
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -134,7 +154,7 @@ async def update_user(
         user.email = user_data.email
 
     if user_data.username and user_data.username != user.username:
-        existing = db.query(User).filter(User.username == user_data.username).first()
+        existing = await db.scalar(select(User).where(User.username == user_data.username))
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken"
@@ -145,7 +165,8 @@ async def update_user(
         user.full_name = user_data.full_name
 
     if user_data.password:
-        user.hashed_password = get_password_hash(user_data.password)
+        user.hashed_password = await get_password_hash_async(user_data.password)
+        await RefreshTokenService(db).revoke_user(user.id)
     
     if user_data.email_password is not None:
         user.email_password = encrypt_email_password(user_data.email_password) if user_data.email_password else None
@@ -156,8 +177,9 @@ async def update_user(
     if user_data.is_superuser is not None:
         user.is_superuser = user_data.is_superuser
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    principal_cache.invalidate(cached_username)
+    await db.refresh(user)
     return user
 
 
@@ -169,10 +191,10 @@ async def update_user(
 )
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_superuser: User = Depends(get_current_active_superuser),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -183,6 +205,8 @@ async def delete_user(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot delete yourself"
         )
 
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    principal_cache.invalidate(user.username)
+    response_template_cache.invalidate()
     return None
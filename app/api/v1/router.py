@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, emails, responses
+from app.api.v1.endpoints import auth, users, emails, responses, analytics, archive
 
 api_router = APIRouter()
 
@@ -7,3 +7,5 @@ api_router.include_router(auth.router, prefix="/auth")
 api_router.include_router(users.router, prefix="/users")
 api_router.include_router(emails.router, prefix="/emails")
 api_router.include_router(responses.router, prefix="/responses")
+api_router.include_router(analytics.router, prefix="/analytics")
+api_router.include_router(archive.router, prefix="/archive")
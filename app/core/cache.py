@@ -0,0 +1,165 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+InvalidationHandler = Callable[[Optional[Hashable]], None]
+
+
+class TTLCache:
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl_seconds <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LocalInvalidationChannel:
+    def __init__(self):
+        self._handlers: Dict[str, List[InvalidationHandler]] = defaultdict(list)
+
+    def subscribe(self, topic: str, handler: InvalidationHandler):
+        self._handlers[topic].append(handler)
+
+    def publish(self, topic: str, key: Optional[Hashable] = None):
+        self._dispatch(topic, key)
+
+    def _dispatch(self, topic: str, key: Optional[Hashable]):
+        for handler in list(self._handlers.get(topic, ())):
+            handler(key)
+
+    def _dispatch_all(self):
+        for topic in list(self._handlers):
+            self._dispatch(topic, None)
+
+    def start(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class RedisInvalidationChannel(LocalInvalidationChannel):
+    CHANNEL = "swtaskmanager:cache-invalidation"
+    RETRY_SECONDS = 5.0
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("REDIS_URL is set, but the redis package is not installed")
+        super().__init__()
+        self._redis = redis.Redis.from_url(url)
+        self._pubsub = None
+        self._thread = None
+        self._retry = None
+        self._closed = False
+        # publish вызывается прямо из async-эндпоинтов: сетевой вызов Redis уходит в отдельный поток,
+        # чтобы не блокировать цикл событий. Один поток сохраняет порядок инвалидаций.
+        self._publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-invalidation")
+
+    def start(self):
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(**{self.CHANNEL: self._on_message})
+        except redis.RedisError as error:
+            # Недоступный Redis не должен мешать запуску: до подписки кэши живут не дольше TTL.
+            logger.warning("Redis для инвалидации кэша недоступен, повтор через %.0f с: %s", self.RETRY_SECONDS, error)
+            pubsub.close()
+            if not self._closed:
+                self._retry = threading.Timer(self.RETRY_SECONDS, self._resubscribe)
+                self._retry.daemon = True
+                self._retry.start()
+            return
+        self._pubsub = pubsub
+        self._thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True, exception_handler=self._on_error)
+
+    def _resubscribe(self):
+        # Пока подписки не было, инвалидации других воркеров могли потеряться.
+        self._dispatch_all()
+        self.start()
+
+    def publish(self, topic: str, key: Optional[Hashable] = None):
+        self._dispatch(topic, key)
+        if not self._closed:
+            self._publisher.submit(self._send, topic, key)
+
+    def _send(self, topic: str, key: Optional[Hashable]):
+        try:
+            self._redis.publish(self.CHANNEL, json.dumps([topic, key]))
+        except redis.RedisError:
+            logger.exception("Не удалось отправить инвалидацию кэша %s:%s", topic, key)
+
+    def _on_message(self, message: dict):
+        topic, key = json.loads(message["data"])
+        self._dispatch(topic, key)
+
+    def _on_error(self, error: Exception, pubsub, thread):
+        # Пока подписка недоступна, инвалидации других воркеров теряются: сбрасываем локальные кэши целиком.
+        logger.warning("Потеряно соединение с Redis для инвалидации кэша: %s", error)
+        self._dispatch_all()
+        time.sleep(1.0)
+
+    def close(self):
+        self._closed = True
+        if self._retry is not None:
+            self._retry.cancel()
+        self._publisher.shutdown(wait=True)
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread.join(timeout=2.0)
+        if self._pubsub is not None:
+            self._pubsub.close()
+        self._redis.close()
+
+
+def create_invalidation_channel() -> LocalInvalidationChannel:
+    if settings.REDIS_URL:
+        return RedisInvalidationChannel(settings.REDIS_URL)
+    return LocalInvalidationChannel()
+
+
+invalidation_channel = create_invalidation_channel()
@@ -0,0 +1,48 @@
+import logging
+import zlib
+from functools import lru_cache
+from typing import Callable, Dict, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CODEC = "zlib"
+
+Codec = Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]
+
+CODECS: Dict[str, Codec] = {
+    "plain": (bytes, bytes),
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+
+if zstandard is not None:
+    CODECS["zstd"] = (
+        lambda data: zstandard.ZstdCompressor(level=10).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+
+
+def encode(data: bytes, codec: str) -> bytes:
+    if codec not in CODECS:
+        raise ValueError(f"Unsupported codec: {codec}")
+    return CODECS[codec][0](data)
+
+
+def decode(data: bytes, codec: str) -> bytes:
+    if codec not in CODECS:
+        raise ValueError(f"Unsupported codec: {codec}")
+    return CODECS[codec][1](data)
+
+
+@lru_cache(maxsize=None)
+def writable(codec: str) -> str:
+    # Кодек из настроек, который нельзя использовать (опечатка или не установлен zstandard),
+    # не должен ломать сохранение писем: тела пишутся в zlib, предупреждение выводится один раз.
+    if codec in CODECS:
+        return codec
+    logger.warning("Кодек %r недоступен, тексты писем сохраняются в %s", codec, DEFAULT_CODEC)
+    return DEFAULT_CODEC
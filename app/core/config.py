@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -10,16 +10,57 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     DATABASE_URL: str = "sqlite:///./swtaskmanager.db"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_ECHO: bool = False
+    DB_QUERY_COUNT_HEADER: bool = False
+    DB_SLOW_QUERY_SECONDS: float = 0.2
+    DB_QUERY_BUDGET: int = 10
+    DB_QUERY_BUDGETS: Dict[str, int] = {}
+    DB_QUERY_BUDGET_STRICT: bool = False
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ENCRYPTION_KEY: str = "your-encryption-key-must-be-32-bytes-long-change-this"
+    ENCRYPTION_OLD_KEYS: List[str] = []
+    CREDENTIAL_CACHE_TTL_SECONDS: int = 300
+    CREDENTIAL_CACHE_MAX_SIZE: int = 1024
+    CREDENTIAL_ROTATION_INTERVAL_SECONDS: int = 3600
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: int = 3600
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:5173"]
     CORS_ALLOW_CREDENTIALS: bool = True
     CORS_ALLOW_METHODS: List[str] = ["*"]
     CORS_ALLOW_HEADERS: List[str] = ["*"]
+    CORS_EXPOSE_HEADERS: List[str] = [
+        "X-Next-Cursor", "ETag", "Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset",
+    ]
+    RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_IP_MULTIPLIER: int = 5
+    RATE_LIMIT_ROUTES: Dict[str, int] = {"/health": 0, "/metrics": 0, "/api/v1/emails/fetch": 10}
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    COMPRESSION_MINIMUM_SIZE: int = 1000
+    COMPRESSION_OFFLOAD_SIZE: int = 256 * 1024
+    COMPRESSION_ENCODINGS: List[str] = ["zstd", "br", "gzip"]
+    COMPRESSION_LEVELS: Dict[str, int] = {"zstd": 3, "br": 4, "gzip": 6}
+    COMPRESSION_ROUTE_LEVELS: Dict[str, Dict[str, int]] = {"/api/v1/emails/fetch": {"zstd": 1, "br": 1, "gzip": 1}}
+    COMPRESSION_EXCLUDED_ROUTES: List[str] = []
+    METRICS_ENABLED: bool = True
+    PROFILING_ENABLED: bool = True
+    PROFILING_INTERVAL_SECONDS: float = 0.005
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.1
+    LOOP_MONITOR_THRESHOLD_SECONDS: float = 0.1
     
     SMTP_SERVER: str = "smtp.mail.ru"
     SMTP_PORT: int = 587
@@ -29,6 +70,31 @@ class Settings(BaseSettings):
     SMTP_FROM_NAME: str = "ООО СуперВейв Групп"
     SMTP_USE_TLS: bool = True
 
+    ANALYTICS_ROLLUP_ENABLED: bool = True
+    ANALYTICS_ROLLUP_INTERVAL_SECONDS: int = 60
+    ANALYTICS_ROLLUP_BATCH_SIZE: int = 5000
+    ANALYTICS_ROLLUP_LAG_SECONDS: int = 5
+    ANALYTICS_MAX_BUCKETS: int = 2000
+
+    SENT_EMAIL_BODY_CODEC: str = "zlib"
+    SENT_EMAIL_BODY_MIN_COMPRESS_SIZE: int = 256
+
+    REDIS_URL: Optional[str] = None
+    TEMPLATE_CACHE_TTL_SECONDS: int = 30
+    TEMPLATE_CACHE_MAX_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 4096
+    TOKEN_CACHE_MAX_SIZE: int = 4096
+
+    RETENTION_ENABLED: bool = False
+    RETENTION_INTERVAL_SECONDS: int = 3600
+    RETENTION_BATCH_SIZE: int = 1000
+    RETENTION_VACUUM: bool = True
+    RETENTION_LEASE_SECONDS: int = 3600
+    SENT_EMAIL_RETENTION_DAYS: int = 365
+    ATTACHMENT_RETENTION_DAYS: int = 365
+    ARCHIVE_DIR: str = "archive"
+
     class Config:
         env_file = ".env"
         case_sensitive = True
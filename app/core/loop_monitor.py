@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import List, Optional
+from app.core.config import settings
+from app.core.metrics import EVENT_LOOP_BLOCKED, EVENT_LOOP_LAG
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def blocking_site(stack: List[traceback.FrameSummary]) -> str:
+    # Место в коде проекта, откуда сделан блокирующий вызов: по нему считается метрика,
+    # поэтому число значений метки ограничено числом строк кода, а не стеков.
+    for frame in reversed(stack):
+        if frame.filename.startswith(ROOT_DIR + os.sep) and frame.filename != __file__:
+            return f"{os.path.relpath(frame.filename, ROOT_DIR)}:{frame.lineno}"
+    return f"{stack[-1].filename}:{stack[-1].lineno}" if stack else "unknown"
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self.blocked = 0
+        self.max_lag = 0.0
+        self.last_beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        # Вызывается из цикла событий, который нужно наблюдать.
+        self._loop_thread = threading.get_ident()
+        self._stopped.clear()
+        self.last_beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._watchdog is not None:
+            self._watchdog.join()
+
+    async def _probe(self):
+        # Задержка пробуждения после sleep - время, которое цикл был занят чем-то другим.
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.last_beat = time.monotonic()
+            lag = max(0.0, self.last_beat - started - self.interval)
+            self.max_lag = max(self.max_lag, lag)
+            EVENT_LOOP_LAG.observe(lag)
+
+    def _watch(self):
+        # Пока цикл заблокирован, probe не может об этом сообщить: поэтому стек блокирующего
+        # вызова снимает отдельный поток, один раз за каждую остановку цикла.
+        reported_beat = None
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self.last_beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.threshold or beat == reported_beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            reported_beat = beat
+            stack = traceback.extract_stack(frame)
+            site = blocking_site(stack)
+            self.blocked += 1
+            EVENT_LOOP_BLOCKED.inc(site)
+            logger.warning(
+                "Цикл событий заблокирован дольше %.0f мс в %s:\n%s",
+                stalled * 1000,
+                site,
+                "".join(traceback.format_list(stack)),
+            )
+
+
+loop_monitor = LoopLagMonitor(settings.LOOP_MONITOR_INTERVAL_SECONDS, settings.LOOP_MONITOR_THRESHOLD_SECONDS)
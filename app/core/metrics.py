@@ -0,0 +1,248 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+from app.core.database import async_engine, engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _ThreadShards:
+    # Каждый поток пишет только в свой словарь, поэтому запись обходится без блокировок;
+    # при выводе /metrics словари всех потоков складываются. Пул потоков AnyIO завершает
+    # простаивающие потоки, поэтому словари завершившихся потоков при сборе переносятся
+    # в общий итог и удаляются: их число не превышает числа живых потоков.
+    def __init__(self, merge: Callable[[dict, dict], None]):
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._retired: dict = {}
+        self.shards: Dict[threading.Thread, dict] = {}
+
+    def get(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self.shards[threading.current_thread()] = shard
+        return shard
+
+    def collect(self) -> dict:
+        totals: dict = {}
+        with self._lock:
+            for thread, shard in list(self.shards.items()):
+                if not thread.is_alive():
+                    self._merge(self._retired, shard)
+                    del self.shards[thread]
+            self._merge(totals, self._retired)
+            for shard in self.shards.values():
+                self._merge(totals, shard)
+        return totals
+
+
+def _merge_counts(totals: Dict[Labels, float], shard: Dict[Labels, float]):
+    for labels, value in list(shard.items()):
+        totals[labels] = totals.get(labels, 0) + value
+
+
+def _merge_histograms(totals: Dict[Labels, List[float]], shard: Dict[Labels, List[float]]):
+    for labels, state in list(shard.items()):
+        total = totals.setdefault(labels, [0] * len(state))
+        for index, value in enumerate(state):
+            total[index] += value
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = _ThreadShards(_merge_counts)
+
+    def inc(self, *labels: str, amount: float = 1):
+        shard = self._shards.get()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self) -> Dict[Labels, float]:
+        return self._shards.collect()
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.collect().items())
+        ]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._shards = _ThreadShards(_merge_histograms)
+
+    def observe(self, value: float, *labels: str):
+        shard = self._shards.get()
+        state = shard.get(labels)
+        if state is None:
+            # Счетчики корзин (последняя - +Inf), затем сумма наблюдений.
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def collect(self) -> Dict[Labels, List[float]]:
+        return self._shards.collect()
+
+    def render(self) -> List[str]:
+        lines = []
+        bucket_names = (*self.labelnames, "le")
+        for labels, state in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), state):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_names, (*labels, _format_value(bound)))} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[Labels, float]],
+    ):
+        # Значение не хранится, а читается в момент запроса /metrics.
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.collect().items())
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str], collect) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def track_operation(operations: Counter, durations: Histogram, operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        durations.observe(time.perf_counter() - started, operation)
+        operations.inc(operation, outcome)
+
+
+def _pool_stats() -> Dict[Labels, float]:
+    stats = {}
+    for name, pool in (("async", async_engine.pool), ("sync", engine.pool)):
+        # У пулов без ограничения размера (StaticPool, NullPool) этих счетчиков нет.
+        for state, method in (
+            ("size", "size"), ("checked_in", "checkedin"), ("checked_out", "checkedout"), ("overflow", "overflow"),
+        ):
+            if hasattr(pool, method):
+                stats[(name, state)] = getattr(pool, method)()
+    return stats
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса", ("method", "route", "status")
+)
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "db_queries_per_request", "Число SQL-запросов за HTTP-запрос", ("route",), COUNT_BUCKETS
+)
+DB_REQUEST_QUERY_DURATION = registry.histogram(
+    "db_request_query_duration_seconds", "Суммарное время SQL-запросов за HTTP-запрос", ("route",), QUERY_BUCKETS
+)
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds", "Время выполнения одного SQL-запроса", (), QUERY_BUCKETS
+)
+DB_QUERY_BUDGET_EXCEEDED = registry.counter(
+    "db_query_budget_exceeded_total", "HTTP-запросы, превысившие бюджет SQL-запросов", ("route",)
+)
+DB_POOL = registry.gauge("db_pool_connections", "Состояние пула соединений с базой", ("engine", "state"), _pool_stats)
+IMAP_OPERATIONS = registry.counter(
+    "imap_operations_total", "Операции IMAP: подключение, вход, выбор папки, поиск, загрузка писем", ("operation", "outcome")
+)
+IMAP_OPERATION_DURATION = registry.histogram(
+    "imap_operation_duration_seconds", "Время операций IMAP", ("operation",)
+)
+SMTP_SENDS = registry.counter("smtp_sends_total", "Отправки писем через SMTP", ("outcome",))
+SMTP_SEND_DURATION = registry.histogram("smtp_send_duration_seconds", "Время отправки письма через SMTP", ("outcome",))
+EVENT_LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds", "Задержка планирования цикла событий", (), LAG_BUCKETS
+)
+EVENT_LOOP_BLOCKED = registry.counter(
+    "event_loop_blocked_total", "Блокировки цикла событий дольше порога по месту вызова", ("site",)
+)
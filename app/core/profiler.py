@@ -0,0 +1,61 @@
+import os
+import sys
+import threading
+from collections import Counter
+from functools import lru_cache
+from types import FrameType
+from typing import List, Optional
+
+SEARCH_PATHS = sorted({os.path.abspath(path) for path in sys.path if path}, key=len, reverse=True)
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    for path in SEARCH_PATHS:
+        if filename.startswith(path + os.sep):
+            return filename[len(path) + 1:]
+    return filename
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            # Снимаются все потоки: цикл событий, пул потоков, поток aiosqlite. Корень стека - имя потока,
+            # ожидание ввода-вывода видно как кадры select/wait.
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        # Формат collapsed stacks: принимают flamegraph.pl, speedscope и inferno.
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
@@ -0,0 +1,106 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional
+from sqlalchemy import event
+from app.core.config import settings
+from app.core.database import async_engine, engine
+from app.core.metrics import DB_QUERY_BUDGET_EXCEEDED, DB_QUERY_DURATION
+
+logger = logging.getLogger(__name__)
+
+MAX_SHAPE_PARAMETERS = 20
+MAX_LOGGED_STATEMENT = 2000
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+@dataclass
+class QueryCounter:
+    route: Optional[str] = None
+    budget: int = 0
+    count: int = 0
+    duration: float = 0.0
+    statements: List[str] = field(default_factory=list)
+
+
+_current_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+@contextmanager
+def count_queries(route: Optional[str] = None, budget: int = 0) -> Iterator[QueryCounter]:
+    counter = QueryCounter(route=route, budget=budget)
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+def current_query_counter() -> Optional[QueryCounter]:
+    return _current_counter.get()
+
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    # В лог попадают только типы и длины параметров: значения могут содержать личные данные.
+    if executemany:
+        rows = list(parameters)
+        return f"{len(rows)} x {parameter_shape(rows[0])}" if rows else "[]"
+    if isinstance(parameters, dict):
+        items = [f"{key}: {_value_shape(value)}" for key, value in list(parameters.items())[:MAX_SHAPE_PARAMETERS]]
+        opening, closing = "{", "}"
+    elif isinstance(parameters, (list, tuple)):
+        items = [_value_shape(value) for value in parameters[:MAX_SHAPE_PARAMETERS]]
+        opening, closing = "(", ")"
+    else:
+        return _value_shape(parameters)
+    if len(parameters) > MAX_SHAPE_PARAMETERS:
+        items.append(f"... +{len(parameters) - MAX_SHAPE_PARAMETERS}")
+    return opening + ", ".join(items) + closing
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+    counter = _current_counter.get()
+    if counter is None:
+        return
+    counter.count += 1
+    counter.statements.append(statement)
+    # Сообщается один раз за запрос, в момент превышения бюджета.
+    if counter.budget > 0 and counter.count == counter.budget + 1:
+        DB_QUERY_BUDGET_EXCEEDED.inc(counter.route or "")
+        message = f"Маршрут {counter.route} превысил бюджет в {counter.budget} SQL-запросов"
+        if settings.DB_QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning("%s, последний запрос: %s", message, " ".join(statement.split())[:MAX_LOGGED_STATEMENT])
+
+
+def _time_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("query_started")
+    DB_QUERY_DURATION.observe(elapsed)
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.duration += elapsed
+    if 0 < settings.DB_SLOW_QUERY_SECONDS <= elapsed:
+        logger.warning(
+            "Медленный SQL-запрос %.1f мс, маршрут %s, параметры %s: %s",
+            elapsed * 1000,
+            counter.route if counter is not None else "вне HTTP-запроса",
+            parameter_shape(parameters, executemany),
+            " ".join(statement.split())[:MAX_LOGGED_STATEMENT],
+        )
+
+
+for _engine in (engine, async_engine.sync_engine):
+    event.listen(_engine, "before_cursor_execute", _count_query)
+    event.listen(_engine, "after_cursor_execute", _time_query)
@@ -1,18 +1,20 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from cryptography.fernet import Fernet
-import base64
 import hashlib
+import time
+from app.core.cache import MISSING, TTLCache
 from app.core.config import settings
+from app.core.vault import vault
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def _get_fernet() -> Fernet:
-    key = hashlib.sha256(settings.ENCRYPTION_KEY.encode()).digest()
-    return Fernet(base64.urlsafe_b64encode(key))
-
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+# bcrypt держит поток ~250 мс: в event loop он останавливал бы все запросы, поэтому работает в отдельном пуле.
+password_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+# Проверенные токены: ключ - sha256 токена, запись живет до истечения exp.
+verified_tokens = TTLCache(settings.TOKEN_CACHE_MAX_SIZE, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -22,6 +24,16 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -38,7 +50,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def decode_token(token: str) -> Optional[dict]:
+def verify_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -48,20 +60,20 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
+def decode_token(token: str) -> Optional[dict]:
+    key = hashlib.sha256(token.encode()).digest()
+    payload = verified_tokens.get(key)
+    if payload is MISSING:
+        payload = verify_token(token)
+        if payload is None or "exp" not in payload:
+            return payload
+        verified_tokens.set(key, payload, ttl_seconds=min(payload["exp"] - time.time(), verified_tokens.ttl_seconds))
+    return dict(payload)
+
+
 def encrypt_email_password(plain_password: str) -> str:
-    if not plain_password:
-        return None
-    fernet = _get_fernet()
-    encrypted = fernet.encrypt(plain_password.encode())
-    return encrypted.decode()
+    return vault.encrypt(plain_password)
 
 
 def decrypt_email_password(encrypted_password: str) -> Optional[str]:
-    if not encrypted_password:
-        return None
-    try:
-        fernet = _get_fernet()
-        decrypted = fernet.decrypt(encrypted_password.encode())
-        return decrypted.decode()
-    except Exception:
-        return None
+    return vault.decrypt(encrypted_password)
@@ -0,0 +1,55 @@
+import base64
+import hashlib
+from typing import List, Optional
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+
+
+def derive_fernet_key(secret: str) -> bytes:
+    return base64.urlsafe_b64encode(hashlib.sha256(secret.encode()).digest())
+
+
+class CredentialVault:
+    def __init__(self, keys: List[str], cache_max_size: int, cache_ttl_seconds: float):
+        # Первый ключ шифрует, остальные только расшифровывают данные, записанные до ротации.
+        fernets = [Fernet(derive_fernet_key(key)) for key in keys]
+        self.primary = fernets[0]
+        self.cipher = MultiFernet(fernets)
+        # Расшифрованные пароли живут только в памяти процесса. Ключ - шифротекст: при смене
+        # пароля или перешифровании он меняется, поэтому старая запись просто перестает читаться.
+        self.credentials = TTLCache(cache_max_size, cache_ttl_seconds)
+
+    def encrypt(self, plain_text: str) -> Optional[str]:
+        if not plain_text:
+            return None
+        return self.cipher.encrypt(plain_text.encode()).decode()
+
+    def decrypt(self, encrypted_text: str) -> Optional[str]:
+        if not encrypted_text:
+            return None
+        plain_text = self.credentials.get(encrypted_text)
+        if plain_text is MISSING:
+            try:
+                plain_text = self.cipher.decrypt(encrypted_text.encode()).decode()
+            except InvalidToken:
+                return None
+            self.credentials.set(encrypted_text, plain_text)
+        return plain_text
+
+    def needs_rotation(self, encrypted_text: str) -> bool:
+        try:
+            self.primary.decrypt(encrypted_text.encode())
+            return False
+        except InvalidToken:
+            return True
+
+    def rotate(self, encrypted_text: str) -> str:
+        return self.cipher.rotate(encrypted_text.encode()).decode()
+
+
+vault = CredentialVault(
+    [settings.ENCRYPTION_KEY, *settings.ENCRYPTION_OLD_KEYS],
+    settings.CREDENTIAL_CACHE_MAX_SIZE,
+    settings.CREDENTIAL_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,225 @@
+import zlib
+from typing import Callable, Dict, List, Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.middleware.routes import route_template
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+ENCODERS: Dict[str, Callable[[int], object]] = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+
+def negotiate_encoding(accept_encoding: str, preference: List[str]) -> Optional[str]:
+    # Из кодеков с наибольшим q выбирается первый по порядку предпочтения сервера.
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in preference:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if encoding in ENCODERS and weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress_body(encoding: str, level: int, body: bytes) -> bytes:
+    encoder = ENCODERS[encoding](level)
+    return encoder.compress(body) + encoder.finish()
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        offload_size: Optional[int] = None,
+        encodings: Optional[List[str]] = None,
+        levels: Optional[Dict[str, int]] = None,
+        route_levels: Optional[Dict[str, Dict[str, int]]] = None,
+        excluded_routes: Optional[List[str]] = None,
+    ):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+        self.offload_size = settings.COMPRESSION_OFFLOAD_SIZE if offload_size is None else offload_size
+        self.encodings = settings.COMPRESSION_ENCODINGS if encodings is None else encodings
+        self.levels = settings.COMPRESSION_LEVELS if levels is None else levels
+        self.route_levels = settings.COMPRESSION_ROUTE_LEVELS if route_levels is None else route_levels
+        self.excluded_routes = set(settings.COMPRESSION_EXCLUDED_ROUTES if excluded_routes is None else excluded_routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope)
+        if route in self.excluded_routes:
+            await self.app(scope, receive, send)
+            return
+
+        levels = {**self.levels, **self.route_levels.get(route, {})}
+        preference = [encoding for encoding in self.encodings if levels.get(encoding, 0) > 0]
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), preference)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = CompressionResponder(send, encoding, levels[encoding], self.minimum_size, self.offload_size)
+        await self.app(scope, receive, responder.send)
+
+
+class CompressionResponder:
+    def __init__(self, send: Send, encoding: str, level: int, minimum_size: int, offload_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.encoder = None
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            # Уже сжатые ответы, ответы без тела и server-sent events отдаются как есть.
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or headers.get("content-type", "").startswith("text/event-stream")
+            )
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is not None:
+            await self._send_chunk(body, more_body)
+            return
+
+        if self.start_message is None or self.passthrough:
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers.add_vary_header("Accept-Encoding")
+
+        if not more_body:
+            if len(body) < self.minimum_size:
+                await self._flush_start()
+                await self._send(message)
+                return
+            body = await self._run(compress_body, self.encoding, self.level, body)
+            headers["Content-Encoding"] = self.encoding
+            headers["Content-Length"] = str(len(body))
+            await self._flush_start()
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        # Потоковый ответ: каждый фрагмент сжимается и сбрасывается сразу, длина заранее неизвестна.
+        headers["Content-Encoding"] = self.encoding
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        self.encoder = ENCODERS[self.encoding](self.level)
+        await self._flush_start()
+        await self._send_chunk(body, more_body)
+
+    async def _flush_start(self):
+        if self.start_message is not None:
+            start_message, self.start_message = self.start_message, None
+            await self._send(start_message)
+
+    async def _send_chunk(self, body: bytes, more_body: bool):
+        if more_body:
+            chunk = await self._run(self._compress_chunk, body)
+        else:
+            chunk = await self._run(self._finish_chunk, body)
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _compress_chunk(self, body: bytes) -> bytes:
+        return self.encoder.compress(body) + self.encoder.flush()
+
+    def _finish_chunk(self, body: bytes) -> bytes:
+        return self.encoder.compress(body) + self.encoder.finish()
+
+    async def _run(self, function, *args) -> bytes:
+        # Большие тела сжимаются в пуле потоков: zlib, brotli и zstd отпускают GIL,
+        # и цикл событий продолжает обслуживать другие запросы.
+        if len(args[-1]) >= self.offload_size:
+            return await run_in_threadpool(function, *args)
+        return function(*args)
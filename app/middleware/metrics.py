@@ -0,0 +1,35 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import DB_QUERIES_PER_REQUEST, DB_REQUEST_QUERY_DURATION, HTTP_REQUEST_DURATION
+from app.core.query_counter import current_query_counter
+from app.middleware.routes import route_template
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_template(scope)
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, scope["method"], route, str(status))
+            # Счетчик создает QueryCounterMiddleware, который добавляется после этого middleware.
+            counter = current_query_counter()
+            if counter is not None:
+                DB_QUERIES_PER_REQUEST.observe(counter.count, route)
+                DB_REQUEST_QUERY_DURATION.observe(counter.duration, route)
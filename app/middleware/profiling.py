@@ -0,0 +1,99 @@
+import threading
+import time
+from typing import Optional
+from urllib.parse import parse_qs
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.api.dependencies import get_current_active_superuser, get_current_user
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.profiler import SamplingProfiler
+from app.middleware.routes import route_template
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY = "profile"
+
+# Профилировщик снимает все потоки процесса, поэтому профили не должны пересекаться.
+profile_lock = threading.Lock()
+
+
+def profile_requested(scope: Scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER.encode():
+            return value not in (b"", b"0", b"false")
+    query_string = scope.get("query_string", b"")
+    if PROFILE_QUERY.encode() not in query_string:
+        return False
+    values = parse_qs(query_string.decode("latin-1")).get(PROFILE_QUERY, [])
+    return any(value not in ("", "0", "false") for value in values)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, interval: Optional[float] = None):
+        self.app = app
+        self.interval = settings.PROFILING_INTERVAL_SECONDS if interval is None else interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self._authorize(scope)
+        except HTTPException as exc:
+            response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+            await response(scope, receive, send)
+            return
+
+        if not profile_lock.acquire(blocking=False):
+            response = JSONResponse(
+                {"detail": "Профилирование другого запроса еще не завершено"}, status_code=status.HTTP_409_CONFLICT
+            )
+            await response(scope, receive, send)
+            return
+
+        response_status = 500
+
+        async def discard_response(message: Message):
+            # Ответ эндпоинта полностью формируется и сжимается, но клиенту вместо него уходит профиль.
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+
+        try:
+            profiler = SamplingProfiler(self.interval)
+            started = time.perf_counter()
+            profiler.start()
+            try:
+                await self.app(scope, receive, discard_response)
+            finally:
+                profiler.stop()
+            elapsed = time.perf_counter() - started
+        finally:
+            profile_lock.release()
+
+        route = route_template(scope).strip("/").replace("/", "-").replace("{", "").replace("}", "") or "root"
+        response = Response(
+            profiler.collapsed(),
+            media_type="text/plain; charset=utf-8",
+            headers={
+                "Content-Disposition": f'attachment; filename="profile-{route}-{int(time.time())}.folded"',
+                "X-Profile-Status": str(response_status),
+                "X-Profile-Duration": f"{elapsed * 1000:.1f}",
+                "X-Profile-Samples": str(profiler.samples),
+            },
+        )
+        await response(scope, receive, send)
+
+    async def _authorize(self, scope: Scope):
+        scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        async with AsyncSessionLocal() as db:
+            await get_current_active_superuser(await get_current_user(token, db))
@@ -0,0 +1,36 @@
+from typing import Dict, Optional
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.query_counter import count_queries
+from app.middleware.routes import route_template
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+
+
+class QueryCounterMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        expose_header: bool = False,
+        budget: Optional[int] = None,
+        route_budgets: Optional[Dict[str, int]] = None,
+    ):
+        self.app = app
+        self.expose_header = expose_header
+        self.budget = settings.DB_QUERY_BUDGET if budget is None else budget
+        self.route_budgets = settings.DB_QUERY_BUDGETS if route_budgets is None else route_budgets
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope)
+        with count_queries(route, self.route_budgets.get(route, self.budget)) as counter:
+            async def send_with_count(message: Message):
+                if self.expose_header and message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append(QUERY_COUNT_HEADER, str(counter.count))
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
@@ -0,0 +1,192 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+from app.core.security import decode_token
+from app.middleware.routes import route_template
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float = 0.0
+
+
+def evaluate_window(previous: int, current: int, elapsed: float, limit: int, window: float) -> RateLimitResult:
+    # Скользящее окно приближается двумя счетчиками фиксированных окон: предыдущее окно
+    # учитывается с весом той его части, которая еще попадает в последние window секунд.
+    weight = 1 - elapsed / window
+    estimate = previous * weight + current
+    reset_after = window - elapsed
+    if estimate <= limit:
+        return RateLimitResult(True, limit, max(0, math.floor(limit - estimate)), reset_after)
+
+    if current <= limit and previous:
+        retry_after = window * (1 - (limit - current) / previous) - elapsed
+    else:
+        # Отклоненные запросы не учитываются: в следующем окне предыдущим станет current - 1.
+        retry_after = reset_after + window * (1 - (limit - 1) / (current - 1))
+    return RateLimitResult(False, limit, 0, reset_after, max(retry_after, 0.0))
+
+
+class MemoryRateLimitBackend:
+    def __init__(self, max_keys: int):
+        # Ключ живет два окна: после этого его предыдущее окно уже ни на что не влияет.
+        self.windows = TTLCache(max_keys, 2 * WINDOW_SECONDS)
+
+    async def hit(self, key: str, limit: int) -> RateLimitResult:
+        now = time.time()
+        window_index, elapsed = divmod(now, WINDOW_SECONDS)
+        state = self.windows.get(key)
+        if state is MISSING:
+            previous, current = 0, 0
+        else:
+            state_index, previous, current = state
+            if state_index != window_index:
+                previous = current if state_index == window_index - 1 else 0
+                current = 0
+
+        result = evaluate_window(previous, current + 1, elapsed, limit, WINDOW_SECONDS)
+        if result.allowed:
+            current += 1
+        self.windows.set(key, (window_index, previous, current))
+        return result
+
+    async def close(self):
+        pass
+
+
+class RedisRateLimitBackend:
+    PREFIX = "swtaskmanager:rate-limit"
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("REDIS_URL is set, but the redis package is not installed")
+        self._redis = redis.Redis.from_url(url)
+
+    async def hit(self, key: str, limit: int) -> RateLimitResult:
+        now = time.time()
+        window_index, elapsed = divmod(now, WINDOW_SECONDS)
+        current_key = f"{self.PREFIX}:{key}:{int(window_index)}"
+        previous_key = f"{self.PREFIX}:{key}:{int(window_index) - 1}"
+        try:
+            async with self._redis.pipeline(transaction=True) as pipeline:
+                pipeline.incr(current_key)
+                pipeline.expire(current_key, 2 * WINDOW_SECONDS)
+                pipeline.get(previous_key)
+                current, _, previous = await pipeline.execute()
+            result = evaluate_window(int(previous or 0), current, elapsed, limit, WINDOW_SECONDS)
+            if not result.allowed:
+                await self._redis.decr(current_key)
+            return result
+        except redis.RedisError:
+            # Без общего хранилища лимит не проверить: лучше пропустить запрос, чем отказать всем.
+            logger.exception("Не удалось проверить лимит запросов для %s", key)
+            return RateLimitResult(True, limit, limit, WINDOW_SECONDS - elapsed)
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+def create_rate_limit_backend():
+    if settings.REDIS_URL:
+        return RedisRateLimitBackend(settings.REDIS_URL)
+    return MemoryRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS)
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend=None,
+        limit_per_minute: Optional[int] = None,
+        route_limits: Optional[Dict[str, int]] = None,
+        ip_multiplier: Optional[int] = None,
+    ):
+        self.app = app
+        self.backend = backend or create_rate_limit_backend()
+        self.limit_per_minute = settings.RATE_LIMIT_PER_MINUTE if limit_per_minute is None else limit_per_minute
+        self.route_limits = settings.RATE_LIMIT_ROUTES if route_limits is None else route_limits
+        self.ip_multiplier = settings.RATE_LIMIT_IP_MULTIPLIER if ip_multiplier is None else ip_multiplier
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope)
+        limit = self.route_limits.get(route, self.limit_per_minute)
+        if limit <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        result = None
+        for key, key_limit in self._client_limits(scope, limit):
+            hit = await self.backend.hit(f"{key}:{scope['method']}:{route}", key_limit)
+            # В заголовки попадает тот лимит, который ближе к исчерпанию (или который отказал).
+            if result is None or not hit.allowed or hit.remaining < result.remaining:
+                result = hit
+            if not hit.allowed:
+                break
+        if not result.allowed:
+            response = JSONResponse(
+                {"detail": "Слишком много запросов. Повторите позже"},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(result.retry_after) or 1), **self._headers(result)},
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in self._headers(result).items():
+                    headers.append(name, value)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    def _headers(self, result: RateLimitResult) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": str(result.remaining),
+            "X-RateLimit-Reset": str(math.ceil(result.reset_after)),
+        }
+
+    def _client_limits(self, scope: Scope, limit: int) -> List[Tuple[str, int]]:
+        # Запрос проверяется и по IP, и по пользователю: иначе с одного IP можно обойти лимит,
+        # меняя токены, а пользователь - разнести запросы по разным IP. За одним IP (NAT, офис)
+        # бывает несколько пользователей, поэтому с токеном бюджет IP в ip_multiplier раз больше.
+        client = scope.get("client")
+        ip_key = f"ip:{client[0] if client else 'unknown'}"
+        username = self._username(scope)
+        if username is None:
+            return [(ip_key, limit)]
+        return [(f"user:{username}", limit), (ip_key, limit * self.ip_multiplier)]
+
+    def _username(self, scope: Scope) -> Optional[str]:
+        authorization = Headers(scope=scope).get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            payload = decode_token(token)
+            if payload and payload.get("sub"):
+                return payload["sub"]
+        return None
@@ -0,0 +1,24 @@
+from typing import Optional
+from starlette.routing import Match
+from starlette.types import Scope
+
+ROUTE_TEMPLATE_KEY = "swtaskmanager.route_template"
+
+
+def route_template(scope: Scope) -> str:
+    # Middleware работают до маршрутизации, поэтому шаблон пути ищется по маршрутам приложения
+    # и запоминается в scope, чтобы следующие middleware не искали его снова.
+    if ROUTE_TEMPLATE_KEY in scope:
+        return scope[ROUTE_TEMPLATE_KEY]
+
+    template: Optional[str] = None
+    partial: Optional[str] = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            template = route.path
+            break
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    scope[ROUTE_TEMPLATE_KEY] = template or partial or "*"
+    return scope[ROUTE_TEMPLATE_KEY]
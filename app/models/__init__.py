@@ -1,5 +1,19 @@
 from app.models.user import User
 from app.models.response_template import ResponseTemplate, EmailResponseAttachment
-from app.models.sent_email import SentEmail
+from app.models.sent_email import SentEmail, SentEmailBody, SentEmailCounter
+from app.models.analytics import SentEmailRollup, RollupWatermark
+from app.models.refresh_token import RefreshToken
+from app.models.job_lease import JobLease
 
-__all__ = ["User", "ResponseTemplate", "EmailResponseAttachment", "SentEmail"]
+__all__ = [
+    "User",
+    "ResponseTemplate",
+    "EmailResponseAttachment",
+    "SentEmail",
+    "SentEmailBody",
+    "SentEmailCounter",
+    "SentEmailRollup",
+    "RollupWatermark",
+    "RefreshToken",
+    "JobLease",
+]
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class SentEmailRollup(Base):
+    __tablename__ = "sent_email_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity", "bucket_start", "user_id", "response_template_id",
+            name="uq_sent_email_rollups_bucket",
+        ),
+        Index("ix_sent_email_rollups_granularity_bucket", "granularity", "bucket_start"),
+        Index("ix_sent_email_rollups_user_granularity_bucket", "user_id", "granularity", "bucket_start"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    granularity = Column(String(8), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    response_template_id = Column(Integer, nullable=True)
+    total = Column(Integer, nullable=False, default=0)
+    successful = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class JobLease(Base):
+    __tablename__ = "job_leases"
+
+    name = Column(String(50), primary_key=True)
+    # Случайный идентификатор запуска, который держит аренду; освободить ее может только он.
+    owner = Column(String(32), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # В базе хранится только sha256 токена: утечка таблицы не дает войти.
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    # Все токены, полученные ротацией из одного входа; повторное использование отозванного токена отзывает семейство.
+    family_id = Column(String(32), nullable=False, index=True)
+    # Индекс нужен фоновой очистке просроченных токенов: без него каждый запуск читает всю таблицу.
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
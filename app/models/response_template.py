@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -20,13 +20,19 @@ class ResponseTemplate(Base):
 
 class EmailResponseAttachment(Base):
     __tablename__ = "email_response_attachments"
+    __table_args__ = (
+        Index(
+            "ix_email_response_attachments_user_id_email_uid_template",
+            "user_id", "email_uid", "response_template_id",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     email_uid = Column(String, nullable=False, index=True) 
     email_subject = Column(String, nullable=True)
     email_from = Column(String, nullable=True)
-    response_template_id = Column(Integer, ForeignKey("response_templates.id", ondelete="CASCADE"), nullable=False)
+    response_template_id = Column(Integer, ForeignKey("response_templates.id", ondelete="CASCADE"), nullable=False, index=True)
     attached_at = Column(DateTime(timezone=True), server_default=func.now())
     notes = Column(Text, nullable=True)
 
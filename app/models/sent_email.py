@@ -1,19 +1,37 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+import hashlib
+from functools import cached_property
+from sqlalchemy import (
+    Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, LargeBinary, case, event, exists, insert,
+    literal, select, update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from app.core import codecs
+from app.core.config import settings
 from app.core.database import Base
 
+# Формат совпадает с CURRENT_TIMESTAMP в SQLite, чтобы значения по умолчанию и параметры
+# запросов (например, курсор пагинации) сравнивались как строки одного вида.
+SQLITE_TIMESTAMP = sqlite.DATETIME(
+    storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+)
+
 
 class SentEmail(Base):
     __tablename__ = "sent_emails"
+    __table_args__ = (
+        Index("ix_sent_emails_user_id_sent_at", "user_id", "sent_at", "id"),
+        Index("ix_sent_emails_user_id_success_sent_at", "user_id", "success", "sent_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     attachment_id = Column(Integer, ForeignKey("email_response_attachments.id", ondelete="SET NULL"), nullable=True, index=True)
     
     to_email = Column(String, nullable=False, index=True)
     subject = Column(String, nullable=False)
-    body = Column(Text, nullable=False)
+    body_hash = Column(String(64), ForeignKey("sent_email_bodies.hash"), nullable=False, index=True)
     
     original_email_uid = Column(String, nullable=True, index=True)
     original_email_subject = Column(String, nullable=True)
@@ -22,10 +40,129 @@ class SentEmail(Base):
     smtp_response = Column(Text, nullable=True)
     error_message = Column(Text, nullable=True)
     
-    sent_at = Column(DateTime(timezone=True), server_default=func.now())
-    response_template_id = Column(Integer, ForeignKey("response_templates.id", ondelete="SET NULL"), nullable=True)
+    sent_at = Column(DateTime(timezone=True).with_variant(SQLITE_TIMESTAMP, "sqlite"), server_default=func.now())
+    response_template_id = Column(Integer, ForeignKey("response_templates.id", ondelete="SET NULL"), nullable=True, index=True)
 
     user = relationship("User", backref="sent_emails")
     attachment = relationship("EmailResponseAttachment", backref="sent_emails")
     response_template = relationship("ResponseTemplate", backref="sent_emails")
+    stored_body = relationship("SentEmailBody")
+
+    @property
+    def body(self) -> str:
+        if "_pending_body" in self.__dict__:
+            return self._pending_body
+        return self.stored_body.text
+
+    @body.setter
+    def body(self, text: str):
+        self._pending_body = text
+        self.body_hash = SentEmailBody.hash_text(text)
+
+
+class SentEmailBody(Base):
+    __tablename__ = "sent_email_bodies"
+
+    hash = Column(String(64), primary_key=True)
+    codec = Column(String(16), nullable=False)
+    content = Column(LargeBinary, nullable=False)
+    original_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def values_for(text: str) -> dict:
+        data = text.encode("utf-8")
+        codec = codecs.writable(settings.SENT_EMAIL_BODY_CODEC)
+        content = data
+        if codec != "plain" and len(data) >= settings.SENT_EMAIL_BODY_MIN_COMPRESS_SIZE:
+            content = codecs.encode(data, codec)
+        if len(content) >= len(data):
+            codec, content = "plain", data
+        return {
+            "hash": hashlib.sha256(data).hexdigest(),
+            "codec": codec,
+            "content": content,
+            "original_size": len(data),
+        }
+
+    @cached_property
+    def text(self) -> str:
+        return codecs.decode(self.content, self.codec).decode("utf-8")
+
+
+class SentEmailCounter(Base):
+    __tablename__ = "sent_email_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_sent = Column(Integer, nullable=False, default=0)
+    successful = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+def insert_sent_email_body(connection, text: str) -> str:
+    values = SentEmailBody.values_for(text)
+    if connection.dialect.name == "postgresql":
+        statement = postgresql.insert(SentEmailBody).on_conflict_do_nothing(index_elements=["hash"])
+    elif connection.dialect.name == "sqlite":
+        statement = sqlite.insert(SentEmailBody).on_conflict_do_nothing(index_elements=["hash"])
+    elif connection.scalar(select(SentEmailBody.hash).where(SentEmailBody.hash == values["hash"])):
+        return values["hash"]
+    else:
+        statement = insert(SentEmailBody)
+    connection.execute(statement.values(**values))
+    return values["hash"]
+
+
+@event.listens_for(SentEmail, "before_insert")
+def store_sent_email_body(mapper, connection, target):
+    if "_pending_body" in target.__dict__:
+        insert_sent_email_body(connection, target._pending_body)
+
+
+def sent_email_counter_seed(dialect_name: str, user_id: int):
+    # Строка счетчика считается по истории писем и вставляется одним запросом: письмо, сохраненное
+    # между подсчетом и вставкой, не может потеряться. Если строку уже создала другая транзакция,
+    # вставка пропускается (rowcount == 0).
+    successful = func.coalesce(func.sum(case((SentEmail.success, 1), else_=0)), 0)
+    totals = select(
+        literal(user_id), func.count(SentEmail.id), successful, func.count(SentEmail.id) - successful,
+    ).where(SentEmail.user_id == user_id)
+    columns = ["user_id", "total_sent", "successful", "failed"]
+    if dialect_name == "postgresql":
+        return postgresql.insert(SentEmailCounter).from_select(columns, totals).on_conflict_do_nothing(
+            index_elements=["user_id"]
+        )
+    if dialect_name == "sqlite":
+        return sqlite.insert(SentEmailCounter).from_select(columns, totals).on_conflict_do_nothing(
+            index_elements=["user_id"]
+        )
+    return insert(SentEmailCounter).from_select(
+        columns,
+        totals.where(~exists().where(SentEmailCounter.user_id == user_id)),
+    )
+
 
+@event.listens_for(SentEmail, "after_insert")
+def increment_sent_email_counter(mapper, connection, target):
+    successful = 1 if target.success else 0
+    increment = (
+        update(SentEmailCounter)
+        .where(SentEmailCounter.user_id == target.user_id)
+        .values(
+            total_sent=SentEmailCounter.total_sent + 1,
+            successful=SentEmailCounter.successful + successful,
+            failed=SentEmailCounter.failed + (1 - successful),
+            updated_at=func.now(),
+        )
+    )
+    if connection.execute(increment).rowcount:
+        return
+    # Строки еще нет: она создается по полной истории, в которую уже входит это письмо. Если ее
+    # одновременно создала другая транзакция, в ее подсчет это письмо не попало - нужен инкремент.
+    if not connection.execute(sent_email_counter_seed(connection.dialect.name, target.user_id)).rowcount:
+        connection.execute(increment)
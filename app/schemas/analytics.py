@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Optional, List, Literal
+from datetime import datetime
+
+
+class TimeSeriesPoint(BaseModel):
+    bucket_start: datetime
+    total: int
+    successful: int
+    failed: int
+    success_rate: Optional[float] = None
+
+
+class TimeSeries(BaseModel):
+    user_id: Optional[int] = None
+    response_template_id: Optional[int] = None
+    points: List[TimeSeriesPoint] = []
+
+
+class SentEmailTimeSeriesResponse(BaseModel):
+    granularity: Literal["hour", "day"]
+    group_by: Literal["none", "user", "template"]
+    start: datetime
+    end: datetime
+    series: List[TimeSeries] = []
@@ -0,0 +1,243 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.analytics import SentEmailRollup, RollupWatermark
+from app.models.sent_email import SentEmail
+from app.schemas.analytics import TimeSeries, TimeSeriesPoint
+
+ROLLUP_GRANULARITIES = {"hour": "h", "day": "D"}
+SENT_EMAILS_WATERMARK = "sent_emails"
+METRIC_COLUMNS = ["total", "successful", "failed"]
+GROUP_COLUMNS = {"none": [], "user": ["user_id"], "template": ["response_template_id"]}
+NO_TEMPLATE = -1
+
+
+def to_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class SentEmailRollupService:
+    def __init__(self, db: Session, batch_size: Optional[int] = None, lag_seconds: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.ANALYTICS_ROLLUP_BATCH_SIZE
+        self.lag_seconds = settings.ANALYTICS_ROLLUP_LAG_SECONDS if lag_seconds is None else lag_seconds
+
+    def refresh(self) -> int:
+        processed = 0
+        while True:
+            batch = self._process_batch()
+            processed += batch
+            if batch < self.batch_size:
+                return processed
+
+    def _get_watermark(self) -> RollupWatermark:
+        watermark = (
+            self.db.query(RollupWatermark)
+            .filter(RollupWatermark.name == SENT_EMAILS_WATERMARK)
+            .first()
+        )
+        if watermark is None:
+            self.db.add(RollupWatermark(name=SENT_EMAILS_WATERMARK, last_id=0))
+            try:
+                self.db.commit()
+            except IntegrityError:
+                self.db.rollback()
+            watermark = (
+                self.db.query(RollupWatermark)
+                .filter(RollupWatermark.name == SENT_EMAILS_WATERMARK)
+                .one()
+            )
+        return watermark
+
+    def _process_batch(self) -> int:
+        last_id = self._get_watermark().last_id
+        rows = (
+            self.db.query(
+                SentEmail.id,
+                SentEmail.sent_at,
+                SentEmail.user_id,
+                SentEmail.response_template_id,
+                SentEmail.success,
+            )
+            .filter(SentEmail.id > last_id)
+            .order_by(SentEmail.id)
+            .limit(self.batch_size)
+            .all()
+        )
+        if not rows:
+            return 0
+
+        frame = pd.DataFrame(rows, columns=["id", "sent_at", "user_id", "response_template_id", "success"])
+        frame["sent_at"] = pd.to_datetime(frame["sent_at"], utc=True)
+
+        # Строки моложе LAG могут еще не быть видны целиком (незакоммиченные id ниже текущего),
+        # поэтому партия обрезается на первой такой строке и дочитывается следующим запуском.
+        cutoff = pd.Timestamp.now(tz="UTC") - pd.Timedelta(seconds=self.lag_seconds)
+        too_recent = (frame["sent_at"] > cutoff).to_numpy()
+        if too_recent.any():
+            frame = frame.iloc[: int(np.argmax(too_recent))]
+        if frame.empty:
+            return 0
+
+        frame["response_template_id"] = frame["response_template_id"].fillna(NO_TEMPLATE).astype("int64")
+        frame["successful"] = frame["success"].astype("int64")
+
+        for granularity, freq in ROLLUP_GRANULARITIES.items():
+            buckets = (
+                frame.assign(bucket_start=frame["sent_at"].dt.floor(freq))
+                .groupby(["bucket_start", "user_id", "response_template_id"], sort=False)
+                .agg(total=("id", "size"), successful=("successful", "sum"))
+                .reset_index()
+            )
+            self._merge_buckets(granularity, buckets)
+
+        new_last_id = int(frame["id"].iloc[-1])
+        result = self.db.execute(
+            update(RollupWatermark)
+            .where(
+                RollupWatermark.name == SENT_EMAILS_WATERMARK,
+                RollupWatermark.last_id == last_id,
+            )
+            .values(last_id=new_last_id)
+        )
+        if result.rowcount != 1:
+            self.db.rollback()
+            return 0
+
+        self.db.commit()
+        return len(frame)
+
+    def _merge_buckets(self, granularity: str, buckets: pd.DataFrame):
+        existing = (
+            self.db.query(SentEmailRollup)
+            .filter(
+                SentEmailRollup.granularity == granularity,
+                SentEmailRollup.bucket_start >= buckets["bucket_start"].min().to_pydatetime(),
+                SentEmailRollup.bucket_start <= buckets["bucket_start"].max().to_pydatetime(),
+                SentEmailRollup.user_id.in_(buckets["user_id"].unique().tolist()),
+            )
+            .all()
+        )
+        rollups: Dict[Tuple[datetime, int, int], SentEmailRollup] = {
+            (
+                to_utc(rollup.bucket_start),
+                rollup.user_id,
+                NO_TEMPLATE if rollup.response_template_id is None else rollup.response_template_id,
+            ): rollup
+            for rollup in existing
+        }
+
+        for bucket_start, user_id, template_id, total, successful in buckets.itertuples(index=False, name=None):
+            key = (bucket_start.to_pydatetime(), int(user_id), int(template_id))
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollup = SentEmailRollup(
+                    granularity=granularity,
+                    bucket_start=key[0],
+                    user_id=key[1],
+                    response_template_id=None if key[2] == NO_TEMPLATE else key[2],
+                    total=0,
+                    successful=0,
+                    failed=0,
+                )
+                self.db.add(rollup)
+                rollups[key] = rollup
+
+            rollup.total += int(total)
+            rollup.successful += int(successful)
+            rollup.failed += int(total) - int(successful)
+
+    def get_time_series(
+        self,
+        granularity: str,
+        start: datetime,
+        end: datetime,
+        group_by: str = "none",
+        user_id: Optional[int] = None,
+        response_template_id: Optional[int] = None,
+    ) -> List[TimeSeries]:
+        freq = ROLLUP_GRANULARITIES[granularity]
+        # Корзина, в которую попадает start, должна войти в выборку целиком, иначе первая точка всегда пустая.
+        start = pd.Timestamp(start).floor(freq).to_pydatetime()
+        query = self.db.query(
+            SentEmailRollup.bucket_start,
+            SentEmailRollup.user_id,
+            SentEmailRollup.response_template_id,
+            SentEmailRollup.total,
+            SentEmailRollup.successful,
+            SentEmailRollup.failed,
+        ).filter(
+            SentEmailRollup.granularity == granularity,
+            SentEmailRollup.bucket_start >= start,
+            SentEmailRollup.bucket_start < end,
+        )
+        if user_id is not None:
+            query = query.filter(SentEmailRollup.user_id == user_id)
+        if response_template_id is not None:
+            query = query.filter(SentEmailRollup.response_template_id == response_template_id)
+
+        frame = pd.DataFrame(
+            query.all(),
+            columns=["bucket_start", "user_id", "response_template_id"] + METRIC_COLUMNS,
+        )
+        frame["bucket_start"] = pd.to_datetime(frame["bucket_start"], utc=True)
+        frame["response_template_id"] = frame["response_template_id"].fillna(NO_TEMPLATE).astype("int64")
+
+        index = pd.date_range(
+            start=pd.Timestamp(start),
+            end=pd.Timestamp(end),
+            freq=freq,
+            inclusive="left",
+            name="bucket_start",
+        )
+
+        group_columns = GROUP_COLUMNS[group_by]
+        if group_columns:
+            grouped = frame.groupby(group_columns + ["bucket_start"])[METRIC_COLUMNS].sum()
+            parts = [
+                (int(key), grouped.xs(key, level=group_columns[0]))
+                for key in grouped.index.get_level_values(group_columns[0]).unique()
+            ]
+        else:
+            parts = [(None, frame.groupby("bucket_start")[METRIC_COLUMNS].sum())]
+
+        series = []
+        for key, part in parts:
+            part = part.reindex(index, fill_value=0)
+            totals = part["total"].to_numpy()
+            successful = part["successful"].to_numpy()
+            success_rate = np.divide(
+                successful,
+                totals,
+                out=np.full(len(part), np.nan),
+                where=totals > 0,
+            )
+
+            points = [
+                TimeSeriesPoint(
+                    bucket_start=bucket_start.to_pydatetime(),
+                    total=int(total),
+                    successful=int(ok),
+                    failed=int(failed),
+                    success_rate=None if np.isnan(rate) else round(float(rate), 4),
+                )
+                for bucket_start, total, ok, failed, rate in zip(
+                    part.index, totals, successful, part["failed"].to_numpy(), success_rate
+                )
+            ]
+
+            item = TimeSeries(points=points)
+            if group_by == "user":
+                item.user_id = key
+            elif group_by == "template":
+                item.response_template_id = None if key == NO_TEMPLATE else key
+            series.append(item)
+
+        return series
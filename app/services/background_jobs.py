@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from typing import Callable, List
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.services.analytics_service import SentEmailRollupService
+from app.services.credential_rotation_service import CredentialRotationService
+from app.services.job_lease_service import JobLeaseService
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.retention_service import RETENTION_LEASE, RetentionService
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_sent_email_rollups() -> int:
+    db = SessionLocal()
+    try:
+        return SentEmailRollupService(db).refresh()
+    finally:
+        db.close()
+
+
+def archive_expired_rows() -> dict:
+    db = SessionLocal()
+    try:
+        with JobLeaseService(db).hold(RETENTION_LEASE, settings.RETENTION_LEASE_SECONDS) as acquired:
+            if not acquired:
+                logger.info("Архивация уже выполняется другим воркером, запуск пропущен")
+                return {}
+            service = RetentionService(db)
+            archived = service.run()
+            if any(archived.values()):
+                logger.info("Перенесено в архив: %s", archived)
+                service.compact()
+    finally:
+        db.close()
+    return archived
+
+
+async def purge_refresh_tokens() -> int:
+    async with AsyncSessionLocal() as db:
+        purged = await RefreshTokenService(db).purge_expired()
+    if purged:
+        logger.info("Удалено просроченных refresh-токенов: %s", purged)
+    return purged
+
+
+def rotate_email_passwords() -> int:
+    db = SessionLocal()
+    try:
+        rotated = CredentialRotationService(db).run()
+    finally:
+        db.close()
+    if rotated:
+        logger.info("Перешифровано паролей почты: %s", rotated)
+    return rotated
+
+
+async def run_periodically(job: Callable[[], object], interval_seconds: float):
+    while True:
+        try:
+            if asyncio.iscoroutinefunction(job):
+                await job()
+            else:
+                await run_in_threadpool(job)
+        except Exception:
+            logger.exception("Ошибка фоновой задачи %s", job.__name__)
+        await asyncio.sleep(interval_seconds)
+
+
+def start_background_jobs() -> List[asyncio.Task]:
+    tasks = []
+    if settings.ANALYTICS_ROLLUP_ENABLED:
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(refresh_sent_email_rollups, settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS)
+            )
+        )
+    if settings.RETENTION_ENABLED:
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(archive_expired_rows, settings.RETENTION_INTERVAL_SECONDS)
+            )
+        )
+    tasks.append(
+        asyncio.create_task(
+            run_periodically(purge_refresh_tokens, settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS)
+        )
+    )
+    if settings.ENCRYPTION_OLD_KEYS:
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(rotate_email_passwords, settings.CREDENTIAL_ROTATION_INTERVAL_SECONDS)
+            )
+        )
+    return tasks
@@ -0,0 +1,53 @@
+import logging
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from cryptography.fernet import InvalidToken
+from app.core.vault import CredentialVault, vault
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+users = User.__table__
+
+
+class CredentialRotationService:
+    BATCH_SIZE = 500
+
+    def __init__(self, db: Session, credential_vault: CredentialVault = vault):
+        self.db = db
+        self.vault = credential_vault
+
+    def run(self) -> int:
+        rotated = 0
+        last_id = 0
+        while True:
+            rows = self.db.execute(
+                select(users.c.id, users.c.email_password)
+                .where(users.c.id > last_id, users.c.email_password.is_not(None))
+                .order_by(users.c.id)
+                .limit(self.BATCH_SIZE)
+            ).all()
+            if not rows:
+                return rotated
+            last_id = rows[-1].id
+
+            changes = []
+            for row in rows:
+                if not self.vault.needs_rotation(row.email_password):
+                    continue
+                try:
+                    changes.append(
+                        {"user_id": row.id, "old": row.email_password, "new": self.vault.rotate(row.email_password)}
+                    )
+                except InvalidToken:
+                    logger.warning("Пароль почты пользователя %s не расшифровывается ни одним ключом", row.id)
+            if changes:
+                # Условие на старое значение: пароль, измененный админом во время ротации, не перезаписывается.
+                self.db.execute(
+                    update(users)
+                    .where(users.c.id == bindparam("user_id"), users.c.email_password == bindparam("old"))
+                    .values(email_password=bindparam("new")),
+                    changes,
+                )
+                self.db.commit()
+                rotated += len(changes)
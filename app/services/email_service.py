@@ -1,11 +1,59 @@
 import imaplib
 import email
+import logging
+from dataclasses import dataclass, field
 from email.header import decode_header
 from typing import List, Optional, Tuple
 from datetime import datetime
 import re
+from app.core.metrics import IMAP_OPERATION_DURATION, IMAP_OPERATIONS, track_operation
 from app.schemas.email import EmailMessage, EmailAttachment, EmailFolderInfo
 
+logger = logging.getLogger(__name__)
+
+
+def track_imap(operation: str):
+    return track_operation(IMAP_OPERATIONS, IMAP_OPERATION_DURATION, operation)
+
+
+# Внутри сервиса письма хранятся в легких записях со слотами: pydantic-модели строятся
+# один раз, через model_construct, когда письмо уходит в ответ API.
+@dataclass(slots=True)
+class AttachmentRecord:
+    filename: str
+    content_type: str
+    size: int
+
+    def to_schema(self) -> EmailAttachment:
+        return EmailAttachment.model_construct(filename=self.filename, content_type=self.content_type, size=self.size)
+
+
+@dataclass(slots=True)
+class MessageRecord:
+    uid: str
+    subject: str
+    from_address: str
+    to_addresses: List[str]
+    date: Optional[datetime] = None
+    body_plain: Optional[str] = None
+    body_html: Optional[str] = None
+    attachments: List[AttachmentRecord] = field(default_factory=list)
+    is_read: bool = False
+
+    def to_schema(self) -> EmailMessage:
+        return EmailMessage.model_construct(
+            uid=self.uid,
+            subject=self.subject,
+            from_address=self.from_address,
+            to_addresses=self.to_addresses,
+            date=self.date,
+            body_plain=self.body_plain,
+            body_html=self.body_html,
+            has_attachments=bool(self.attachments),
+            attachments=[attachment.to_schema() for attachment in self.attachments],
+            is_read=self.is_read,
+        )
+
 
 class EmailService:
     def __init__(self, email_address: str, password: str, imap_server: str = "imap.mail.ru", imap_port: int = 993):
@@ -17,8 +65,10 @@ class EmailService:
 
     def connect(self) -> Tuple[bool, str]:
         try:
-            self.connection = imaplib.IMAP4_SSL(self.imap_server, self.imap_port)
-            self.connection.login(self.email_address, self.password)
+            with track_imap("connect"):
+                self.connection = imaplib.IMAP4_SSL(self.imap_server, self.imap_port)
+            with track_imap("login"):
+                self.connection.login(self.email_address, self.password)
             return True, "Успешно подключено к серверу email"
         except imaplib.IMAP4.error as e:
             return False, f"Ошибка IMAP аутентификации: {str(e)}"
@@ -39,7 +89,8 @@ class EmailService:
         details = None
         if success:
             try:
-                status, count = self.connection.select('INBOX')
+                with track_imap("select"):
+                    status, count = self.connection.select('INBOX')
                 if status == 'OK':
                     message_count = int(count[0])
                     details = f"Подключено успешно. INBOX содержит {message_count} сообщений."
@@ -57,7 +108,8 @@ class EmailService:
     def list_folders(self) -> List[EmailFolderInfo]:
         folders = []
         try:
-            status, folder_list = self.connection.list()
+            with track_imap("list"):
+                status, folder_list = self.connection.list()
             if status == 'OK':
                 for folder in folder_list:
                     folder_str = folder.decode() if isinstance(folder, bytes) else folder
@@ -66,7 +118,7 @@ class EmailService:
                         folder_name = match.group(1)
                         folders.append(EmailFolderInfo(name=folder_name))
         except Exception as e:
-            print(f"Ошибка процессинга папок: {str(e)}")
+            logger.warning("Ошибка процессинга папок: %s", e)
         
         return folders
 
@@ -139,7 +191,7 @@ class EmailService:
                         elif content_type == "text/html":
                             html = body
                 except Exception as e:
-                    print(f"Ошибка декодирования письма часть: {str(e)}")
+                    logger.warning("Ошибка декодирования письма часть: %s", e)
                     continue
         else:
             try:
@@ -156,11 +208,11 @@ class EmailService:
                     else:
                         plain_text = body  
             except Exception as e:
-                print(f"Ошибка расшифровки письма часть: {str(e)}")
+                logger.warning("Ошибка расшифровки письма часть: %s", e)
 
         return plain_text, html
 
-    def _get_attachments(self, msg: email.message.Message) -> List[EmailAttachment]:
+    def _get_attachments(self, msg: email.message.Message) -> List[AttachmentRecord]:
         attachments = []
         
         if msg.is_multipart():
@@ -176,7 +228,7 @@ class EmailService:
                         payload = part.get_payload(decode=True)
                         size = len(payload) if payload else 0
                         
-                        attachments.append(EmailAttachment(
+                        attachments.append(AttachmentRecord(
                             filename=filename,
                             content_type=content_type,
                             size=size
@@ -190,16 +242,18 @@ class EmailService:
         limit: int = 50, 
         search_criteria: str = "ALL",
         include_body: bool = True
-    ) -> List[EmailMessage]:
+    ) -> List[MessageRecord]:
 
         emails = []
         
         try:
-            status, count = self.connection.select(folder, readonly=True)
+            with track_imap("select"):
+                status, count = self.connection.select(folder, readonly=True)
             if status != 'OK':
                 return emails
             
-            status, messages = self.connection.search(None, search_criteria)
+            with track_imap("search"):
+                status, messages = self.connection.search(None, search_criteria)
             if status != 'OK':
                 return emails
             
@@ -211,10 +265,11 @@ class EmailService:
             
             for email_id in email_ids:
                 try:
-                    if include_body:
-                        status, msg_data = self.connection.fetch(email_id, '(RFC822 FLAGS)')
-                    else:
-                        status, msg_data = self.connection.fetch(email_id, '(BODY[HEADER] FLAGS)')
+                    with track_imap("fetch"):
+                        if include_body:
+                            status, msg_data = self.connection.fetch(email_id, '(RFC822 FLAGS)')
+                        else:
+                            status, msg_data = self.connection.fetch(email_id, '(BODY[HEADER] FLAGS)')
                     
                     if status != 'OK':
                         continue
@@ -244,7 +299,7 @@ class EmailService:
                     
                     attachments = self._get_attachments(msg)
                     
-                    email_msg = EmailMessage(
+                    email_msg = MessageRecord(
                         uid=email_id.decode(),
                         subject=subject,
                         from_address=from_address,
@@ -252,7 +307,6 @@ class EmailService:
                         date=email_date,
                         body_plain=plain_text,
                         body_html=html,
-                        has_attachments=len(attachments) > 0,
                         attachments=attachments,
                         is_read=is_read
                     )
@@ -260,11 +314,11 @@ class EmailService:
                     emails.append(email_msg)
                     
                 except Exception as e:
-                    print(f"Ошибка процессинга писем{email_id}: {str(e)}")
+                    logger.warning("Ошибка процессинга письма %s: %s", email_id, e)
                     continue
         
         except Exception as e:
-            print(f"Ошибка получения писем: {str(e)}")
+            logger.exception("Ошибка получения писем")
         
         return emails
 
@@ -0,0 +1,53 @@
+import secrets
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.job_lease import JobLease
+
+
+class JobLeaseService:
+    # Аренда строки в базе: фоновую задачу, запущенную в каждом воркере (и на каждом сервере),
+    # выполняет только получивший аренду. Если владелец упал, аренда истекает сама.
+    def __init__(self, db: Session):
+        self.db = db
+
+    def acquire(self, name: str, ttl_seconds: float) -> Optional[str]:
+        now = datetime.now(timezone.utc)
+        owner = secrets.token_hex(16)
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        taken_over = self.db.execute(
+            update(JobLease)
+            .where(JobLease.name == name, JobLease.expires_at <= now)
+            .values(owner=owner, expires_at=expires_at),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        if not taken_over:
+            self.db.add(JobLease(name=name, owner=owner, expires_at=expires_at))
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Строка есть и аренда не истекла, либо ее только что создал другой воркер.
+            self.db.rollback()
+            return None
+        return owner
+
+    def release(self, name: str, owner: str):
+        self.db.execute(
+            delete(JobLease).where(JobLease.name == name, JobLease.owner == owner),
+            execution_options={"synchronize_session": False},
+        )
+        self.db.commit()
+
+    @contextmanager
+    def hold(self, name: str, ttl_seconds: float) -> Iterator[bool]:
+        owner = self.acquire(name, ttl_seconds)
+        if owner is None:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            self.release(name, owner)
@@ -0,0 +1,46 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import MISSING, LocalInvalidationChannel, TTLCache, invalidation_channel
+from app.core.config import settings
+from app.models.user import User
+
+USERS_TOPIC = "users"
+USER_FIELDS = [attribute.key for attribute in User.__mapper__.column_attrs]
+
+
+class PrincipalCache:
+    def __init__(self, channel: LocalInvalidationChannel, max_size: int, ttl_seconds: float):
+        self.channel = channel
+        self.users = TTLCache(max_size, ttl_seconds)
+        self._generation = 0
+        channel.subscribe(USERS_TOPIC, self._evict)
+
+    async def get(self, db: AsyncSession, username: str) -> Optional[User]:
+        # В кэше хранятся значения колонок, а не ORM-объект: каждый запрос получает
+        # собственный непривязанный к сессии User, и изменения в одном запросе не видны другим.
+        snapshot = self.users.get(username)
+        if snapshot is MISSING:
+            generation = self._generation
+            user = await db.scalar(select(User).where(User.username == username))
+            if user is None:
+                return None
+            snapshot = {field: getattr(user, field) for field in USER_FIELDS}
+            if generation == self._generation:
+                self.users.set(username, snapshot)
+        return User(**snapshot)
+
+    def invalidate(self, username: Optional[str] = None):
+        self.channel.publish(USERS_TOPIC, username)
+
+    def _evict(self, username: Optional[str]):
+        self._generation += 1
+        if username is None:
+            self.users.clear()
+        else:
+            self.users.delete(username)
+
+
+principal_cache = PrincipalCache(
+    invalidation_channel, settings.PRINCIPAL_CACHE_MAX_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
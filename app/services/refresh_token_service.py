@@ -0,0 +1,89 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.services.analytics_service import to_utc
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RefreshTokenService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def issue(self, user_id: int, family_id: Optional[str] = None) -> str:
+        token = secrets.token_urlsafe(32)
+        self.db.add(
+            RefreshToken(
+                user_id=user_id,
+                token_hash=hash_refresh_token(token),
+                family_id=family_id or secrets.token_hex(16),
+                expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            )
+        )
+        return token
+
+    async def rotate(self, token: str) -> Optional[Tuple[User, str]]:
+        row = (
+            await self.db.execute(
+                select(RefreshToken, User)
+                .join(User, User.id == RefreshToken.user_id)
+                .where(RefreshToken.token_hash == hash_refresh_token(token))
+            )
+        ).first()
+        if row is None:
+            return None
+
+        refresh_token, user = row
+        now = datetime.now(timezone.utc)
+        if to_utc(refresh_token.expires_at) <= now or not user.is_active:
+            return None
+
+        # Отзыв условный: из двух одновременных запросов с одним токеном выиграет только один.
+        revoked = await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == refresh_token.id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
+        if revoked.rowcount == 0:
+            # Токен уже был обменян: его предъявляет кто-то еще, отзываем все токены этого входа.
+            await self._revoke(RefreshToken.family_id == refresh_token.family_id)
+            await self.db.commit()
+            return None
+
+        new_token = self.issue(user.id, refresh_token.family_id)
+        await self.db.commit()
+        return user, new_token
+
+    async def revoke(self, token: str):
+        family_id = (
+            select(RefreshToken.family_id)
+            .where(RefreshToken.token_hash == hash_refresh_token(token))
+            .scalar_subquery()
+        )
+        await self._revoke(RefreshToken.family_id == family_id)
+
+    async def revoke_user(self, user_id: int):
+        await self._revoke(RefreshToken.user_id == user_id)
+
+    async def purge_expired(self, now: Optional[datetime] = None) -> int:
+        # Просроченные токены уже ничего не дают: удаляются без архивации.
+        result = await self.db.execute(
+            delete(RefreshToken).where(RefreshToken.expires_at < (now or datetime.now(timezone.utc)))
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def _revoke(self, condition):
+        await self.db.execute(
+            update(RefreshToken)
+            .where(condition, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc))
+        )
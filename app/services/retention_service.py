@@ -0,0 +1,258 @@
+import gzip
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import delete, exists, func, select, text, update
+from sqlalchemy.orm import Session, selectinload
+from app.core.config import settings
+from app.models.analytics import RollupWatermark
+from app.models.response_template import EmailResponseAttachment
+from app.models.sent_email import SentEmail, SentEmailBody, SentEmailCounter, sent_email_counter_seed
+from app.services.analytics_service import SENT_EMAILS_WATERMARK, to_utc
+
+SENT_EMAILS_ARCHIVE = "sent_emails"
+ATTACHMENTS_ARCHIVE = "email_response_attachments"
+RETENTION_LEASE = "retention"
+ARCHIVED_TABLES = [SENT_EMAILS_ARCHIVE, ATTACHMENTS_ARCHIVE, SentEmailBody.__tablename__]
+
+SENT_EMAIL_FIELDS = [
+    "id", "user_id", "attachment_id", "to_email", "subject", "original_email_uid",
+    "original_email_subject", "success", "smtp_response", "error_message", "sent_at", "response_template_id",
+]
+ATTACHMENT_FIELDS = [
+    "id", "user_id", "email_uid", "email_subject", "email_from", "response_template_id", "attached_at", "notes",
+]
+
+
+def archive_month(value: datetime) -> str:
+    return to_utc(value).strftime("%Y-%m")
+
+
+def to_record(row, fields: List[str]) -> dict:
+    record = {}
+    for field in fields:
+        value = getattr(row, field)
+        record[field] = to_utc(value).isoformat() if isinstance(value, datetime) else value
+    return record
+
+
+_append_lock = threading.Lock()
+
+
+class ArchiveStore:
+    def __init__(self, archive_dir: Optional[str] = None):
+        self.archive_dir = archive_dir or settings.ARCHIVE_DIR
+
+    def _path(self, name: str, month: str) -> str:
+        return os.path.join(self.archive_dir, name, f"{month}.jsonl.gz")
+
+    def append(self, name: str, month: str, records: List[dict]):
+        path = self._path(name, month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Два gzip-потока, дописанные одновременно, перемешались бы и испортили файл. Между процессами
+        # записи разделяет аренда RETENTION_LEASE, внутри процесса - эта блокировка.
+        with _append_lock, open(path, "ab") as file:
+            with gzip.GzipFile(fileobj=file, mode="ab") as archive:
+                for record in records:
+                    archive.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def months(self, name: str, start: Optional[datetime], end: Optional[datetime]) -> List[str]:
+        directory = os.path.join(self.archive_dir, name)
+        if not os.path.isdir(directory):
+            return []
+        months = sorted(
+            file_name[: -len(".jsonl.gz")]
+            for file_name in os.listdir(directory)
+            if file_name.endswith(".jsonl.gz")
+        )
+        return [
+            month for month in months
+            if (start is None or month >= archive_month(start)) and (end is None or month <= archive_month(end))
+        ]
+
+    def read(self, name: str, month: str) -> Iterator[dict]:
+        with gzip.open(self._path(name, month), "rb") as archive:
+            for line in archive:
+                yield json.loads(line)
+
+
+def read_archive(
+    name: str,
+    time_field: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    store: Optional[ArchiveStore] = None,
+) -> List[dict]:
+    store = store or ArchiveStore()
+    start = to_utc(start) if start else None
+    end = to_utc(end) if end else None
+    # Пакет может попасть в архив дважды, если процесс упал между записью файла и удалением строк.
+    seen = set()
+    records = []
+    for month in store.months(name, start, end):
+        for record in store.read(name, month):
+            if record["id"] in seen:
+                continue
+            seen.add(record["id"])
+            if user_id is not None and record["user_id"] != user_id:
+                continue
+            timestamp = datetime.fromisoformat(record[time_field])
+            if (start and timestamp < start) or (end and timestamp >= end):
+                continue
+            if skip:
+                skip -= 1
+                continue
+            records.append(record)
+            if len(records) >= limit:
+                return records
+    return records
+
+
+class RetentionService:
+    def __init__(self, db: Session, store: Optional[ArchiveStore] = None, batch_size: Optional[int] = None):
+        self.db = db
+        self.store = store or ArchiveStore()
+        self.batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        now = now or datetime.now(timezone.utc)
+        return {
+            SENT_EMAILS_ARCHIVE: self.archive_sent_emails(now - timedelta(days=settings.SENT_EMAIL_RETENTION_DAYS)),
+            ATTACHMENTS_ARCHIVE: self.archive_attachments(now - timedelta(days=settings.ATTACHMENT_RETENTION_DAYS)),
+        }
+
+    def archive_sent_emails(self, cutoff: datetime) -> int:
+        archived = 0
+        while True:
+            batch = self._archive_sent_email_batch(cutoff)
+            archived += batch
+            if batch < self.batch_size:
+                return archived
+
+    def archive_attachments(self, cutoff: datetime) -> int:
+        archived = 0
+        while True:
+            batch = self._archive_attachment_batch(cutoff)
+            archived += batch
+            if batch < self.batch_size:
+                return archived
+
+    def _expired_prefix(self, rows: list, time_field: str, cutoff: datetime) -> list:
+        # Идентификаторы растут вместе со временем вставки, поэтому достаточно пройти строки по id
+        # до первой свежей: так каждый проход читает не больше одного пакета, а не всю таблицу.
+        cutoff = to_utc(cutoff)
+        for index, row in enumerate(rows):
+            value = getattr(row, time_field)
+            if value is None or to_utc(value) >= cutoff:
+                return rows[:index]
+        return rows
+
+    def _archive_sent_email_batch(self, cutoff: datetime) -> int:
+        query = (
+            select(SentEmail)
+            .options(selectinload(SentEmail.stored_body))
+            .order_by(SentEmail.id)
+            .limit(self.batch_size)
+        )
+        if settings.ANALYTICS_ROLLUP_ENABLED:
+            watermark = self.db.get(RollupWatermark, SENT_EMAILS_WATERMARK)
+            query = query.where(SentEmail.id <= (watermark.last_id if watermark else 0))
+
+        rows = self._expired_prefix(self.db.scalars(query).all(), "sent_at", cutoff)
+        if not rows:
+            return 0
+
+        months = defaultdict(list)
+        for row in rows:
+            months[archive_month(row.sent_at)].append({**to_record(row, SENT_EMAIL_FIELDS), "body": row.body})
+        for month, records in months.items():
+            self.store.append(SENT_EMAILS_ARCHIVE, month, records)
+
+        user_ids = {row.user_id for row in rows}
+        self._ensure_counters(user_ids)
+        # Меняет ETag статистики: архивированные письма могли входить в список последних.
+        self.db.execute(
+            update(SentEmailCounter).where(SentEmailCounter.user_id.in_(user_ids)).values(updated_at=func.now()),
+            execution_options={"synchronize_session": False},
+        )
+        ids = [row.id for row in rows]
+        body_hashes = list({row.body_hash for row in rows})
+        self.db.execute(
+            delete(SentEmail).where(SentEmail.id.in_(ids)),
+            execution_options={"synchronize_session": False},
+        )
+        self.db.execute(
+            delete(SentEmailBody).where(
+                SentEmailBody.hash.in_(body_hashes),
+                ~exists().where(SentEmail.body_hash == SentEmailBody.hash),
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        self.db.commit()
+        self.db.expunge_all()
+        return len(rows)
+
+    def _archive_attachment_batch(self, cutoff: datetime) -> int:
+        rows = self._expired_prefix(
+            self.db.scalars(
+                select(EmailResponseAttachment).order_by(EmailResponseAttachment.id).limit(self.batch_size)
+            ).all(),
+            "attached_at",
+            cutoff,
+        )
+        if not rows:
+            return 0
+
+        months = defaultdict(list)
+        for row in rows:
+            months[archive_month(row.attached_at)].append(to_record(row, ATTACHMENT_FIELDS))
+        for month, records in months.items():
+            self.store.append(ATTACHMENTS_ARCHIVE, month, records)
+
+        ids = [row.id for row in rows]
+        self.db.execute(
+            update(SentEmail).where(SentEmail.attachment_id.in_(ids)).values(attachment_id=None),
+            execution_options={"synchronize_session": False},
+        )
+        self.db.execute(
+            delete(EmailResponseAttachment).where(EmailResponseAttachment.id.in_(ids)),
+            execution_options={"synchronize_session": False},
+        )
+        self.db.commit()
+        self.db.expunge_all()
+        return len(rows)
+
+    def _ensure_counters(self, user_ids: set):
+        # Счетчики статистики хранят итоги за все время: если строки счетчика еще нет,
+        # ее нужно посчитать до удаления, иначе статистика потеряет архивные письма.
+        existing = set(
+            self.db.scalars(select(SentEmailCounter.user_id).where(SentEmailCounter.user_id.in_(user_ids)))
+        )
+        missing = user_ids - existing
+        if not missing:
+            return
+
+        dialect_name = self.db.get_bind().dialect.name
+        for user_id in missing:
+            self.db.execute(sent_email_counter_seed(dialect_name, user_id))
+        self.db.flush()
+
+    def compact(self):
+        bind = self.db.get_bind()
+        with bind.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            if bind.dialect.name == "sqlite":
+                if settings.RETENTION_VACUUM:
+                    connection.execute(text("VACUUM"))
+                connection.execute(text("ANALYZE"))
+            elif bind.dialect.name == "postgresql":
+                vacuum = "VACUUM (ANALYZE)" if settings.RETENTION_VACUUM else "ANALYZE"
+                connection.execute(text(f"{vacuum} {', '.join(ARCHIVED_TABLES)}"))
@@ -1,9 +1,11 @@
 import smtplib
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.utils import formataddr
 from typing import Optional, Tuple
 from app.core.config import settings
+from app.core.metrics import SMTP_SEND_DURATION, SMTP_SENDS
 
 
 class SMTPService:
@@ -34,8 +36,11 @@ class SMTPService:
         is_html: bool = False
     ) -> Tuple[bool, str]:
         if not self.username or not self.password or not self.from_email:
+            SMTP_SENDS.inc("not_configured")
             return False, "SMTP не настроен. Проверьте SMTP_USERNAME, SMTP_PASSWORD и SMTP_FROM_EMAIL в настройках."
 
+        started = time.perf_counter()
+        outcome = "error"
         try:
             msg = MIMEMultipart('alternative')
             
@@ -66,14 +71,20 @@ class SMTPService:
             server.send_message(msg)
             server.quit()
             
+            outcome = "sent"
             return True, f"Email успешно отправлен на {to_email}"
             
         except smtplib.SMTPAuthenticationError:
+            outcome = "auth_error"
             return False, "Ошибка аутентификации SMTP. Проверьте логин и пароль."
         except smtplib.SMTPException as e:
+            outcome = "smtp_error"
             return False, f"Ошибка SMTP: {str(e)}"
         except Exception as e:
             return False, f"Неожиданная ошибка при отправке email: {str(e)}"
+        finally:
+            SMTP_SEND_DURATION.observe(time.perf_counter() - started, outcome)
+            SMTP_SENDS.inc(outcome)
 
     def test_connection(self) -> Tuple[bool, str]:
         if not self.username or not self.password:
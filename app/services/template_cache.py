@@ -0,0 +1,88 @@
+import hashlib
+from typing import Awaitable, Callable, Hashable, List, NamedTuple, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import MISSING, LocalInvalidationChannel, TTLCache, invalidation_channel
+from app.core.config import settings
+from app.models.response_template import ResponseTemplate
+from app.schemas.response_template import ResponseTemplateResponse
+
+RESPONSE_TEMPLATES_TOPIC = "response_templates"
+
+
+class TemplatePage(NamedTuple):
+    items: List[ResponseTemplateResponse]
+    version: str
+
+
+def page_version(items: List[ResponseTemplateResponse]) -> str:
+    digest = hashlib.blake2b(digest_size=12)
+    for template in items:
+        digest.update(
+            repr((template.id, template.user_id, template.title, template.body, template.send_response)).encode("utf-8")
+        )
+    return digest.hexdigest()
+
+
+class ResponseTemplateCache:
+    def __init__(self, channel: LocalInvalidationChannel, max_size: int, ttl_seconds: float):
+        self.channel = channel
+        self.templates = TTLCache(max_size, ttl_seconds)
+        self.pages = TTLCache(max_size, ttl_seconds)
+        # Увеличивается при каждой инвалидации: результат чтения, начатого до изменения шаблона,
+        # не должен попасть в кэш после нее.
+        self._generation = 0
+        channel.subscribe(RESPONSE_TEMPLATES_TOPIC, self._evict)
+
+    async def get(self, db: AsyncSession, template_id: int) -> Optional[ResponseTemplateResponse]:
+        template = self.templates.get(template_id)
+        if template is not MISSING:
+            return template
+
+        generation = self._generation
+        row = await db.scalar(select(ResponseTemplate).where(ResponseTemplate.id == template_id))
+        if row is None:
+            return None
+
+        template = ResponseTemplateResponse.model_validate(row)
+        if generation == self._generation:
+            self.templates.set(template_id, template)
+        return template
+
+    async def get_current(self, db: AsyncSession, template_id: int) -> Optional[ResponseTemplateResponse]:
+        # Чтение мимо кэша для путей, где устаревший шаблон недопустим; прочитанная версия
+        # попадает в кэш, если шаблон не изменили во время чтения.
+        self.templates.delete(template_id)
+        return await self.get(db, template_id)
+
+    async def get_page(
+        self, key: Hashable, load: Callable[[], Awaitable[Sequence[ResponseTemplate]]]
+    ) -> TemplatePage:
+        page = self.pages.get(key)
+        if page is not MISSING:
+            return page
+
+        generation = self._generation
+        items = [ResponseTemplateResponse.model_validate(row) for row in await load()]
+        page = TemplatePage(items, page_version(items))
+        if generation == self._generation:
+            self.pages.set(key, page)
+            for template in items:
+                self.templates.set(template.id, template)
+        return page
+
+    def invalidate(self, template_id: Optional[int] = None):
+        self.channel.publish(RESPONSE_TEMPLATES_TOPIC, template_id)
+
+    def _evict(self, template_id: Optional[int]):
+        self._generation += 1
+        if template_id is None:
+            self.templates.clear()
+        else:
+            self.templates.delete(template_id)
+        self.pages.clear()
+
+
+response_template_cache = ResponseTemplateCache(
+    invalidation_channel, settings.TEMPLATE_CACHE_MAX_SIZE, settings.TEMPLATE_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,31 @@
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.core.security import create_access_token, decode_token, verified_tokens, verify_token
+
+REQUESTS = 100_000
+CLIENTS = 200
+
+
+def per_call_us(decode, tokens, requests: int) -> float:
+    started = time.perf_counter()
+    for i in range(requests):
+        decode(tokens[i % len(tokens)])
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else REQUESTS
+    tokens = [create_access_token({"sub": f"user{i}"}) for i in range(CLIENTS)]
+
+    verified_tokens.clear()
+    print(f"{'jwt.decode on every request':<32} {per_call_us(verify_token, tokens, requests):8.2f} us/request")
+    print(f"{'verified-token cache':<32} {per_call_us(decode_token, tokens, requests):8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.api.json_response import model_response
+from app.middleware.compression import ENCODERS, compress_body
+from app.schemas.email import EmailAttachment, EmailFetchResponse, EmailMessage
+
+REPEAT = 20
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+WORDS = "здравствуйте спасибо за обращение мы ответим в течение рабочего дня заказ номер оплата доставка счет договор".split()
+LEVELS = {"gzip": [1, 6, 9], "br": [1, 4, 11], "zstd": [1, 3, 19]}
+
+
+def text(rng: random.Random, words: int) -> str:
+    # Случайный текст из словаря сжимается примерно как настоящая переписка, а не как повтор одной строки.
+    return " ".join(rng.choice(WORDS) if rng.random() < 0.8 else str(rng.randrange(100000)) for _ in range(words))
+
+
+def email_fetch_body(count: int) -> bytes:
+    rng = random.Random(count)
+    bodies = [text(rng, 400) for _ in range(count)]
+    emails = [
+        EmailMessage(
+            uid=str(i),
+            subject=f"Вопрос {i}",
+            from_address=f"client{i}@example.com",
+            to_addresses=["support@example.com"],
+            date=NOW,
+            body_plain=bodies[i],
+            body_html=f"<p>{bodies[i]}</p>",
+            has_attachments=True,
+            attachments=[EmailAttachment(filename=f"file{i}.pdf", content_type="application/pdf", size=1024 + i)],
+        )
+        for i in range(count)
+    ]
+    response = EmailFetchResponse(success=True, message="ok", total_count=count, emails=emails)
+    return model_response(EmailFetchResponse, response).body
+
+
+def measure(encoding: str, level: int, body: bytes, repeat: int):
+    compressed = compress_body(encoding, level, body)
+    started = time.process_time()
+    for _ in range(repeat):
+        compress_body(encoding, level, body)
+    return (time.process_time() - started) / repeat * 1000, len(compressed)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else REPEAT
+    for count in (10, 100):
+        body = email_fetch_body(count)
+        print(f"/emails/fetch x{count}: {len(body) / 1024:.1f} KiB")
+        for encoding, levels in LEVELS.items():
+            if encoding not in ENCODERS:
+                print(f"  {encoding:<5} не установлен")
+                continue
+            for level in levels:
+                elapsed, size = measure(encoding, level, body, repeat)
+                print(f"  {encoding:<5} {level:>2}  {elapsed:8.2f} ms CPU  {size / 1024:8.1f} KiB  x{len(body) / size:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
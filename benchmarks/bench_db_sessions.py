@@ -0,0 +1,87 @@
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+BASE_URL = "http://localhost:8000/api/v1"
+USERNAME = "admin"
+PASSWORD = "admin"
+CONCURRENCY = 32
+DURATION_SECONDS = 10
+REQUEST_TIMEOUT_SECONDS = 10
+ENDPOINTS = ["/users/me", "/responses/response/all"]
+
+
+def get_auth_token(username: str, password: str) -> str:
+    response = requests.post(
+        f"{BASE_URL}/auth/login",
+        data={"username": username, "password": password}
+    )
+    if response.status_code == 200:
+        return response.json()["access_token"]
+    else:
+        raise Exception(f"Login failed: {response.text}")
+
+
+def worker(url: str, headers: dict, deadline: float, results: dict, lock: threading.Lock):
+    session = requests.Session()
+    ok = 0
+    errors = 0
+    latencies = []
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
+        except requests.RequestException:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+        if response.status_code == 200:
+            ok += 1
+        else:
+            errors += 1
+    with lock:
+        results["ok"] += ok
+        results["errors"] += errors
+        results["latencies"].extend(latencies)
+
+
+def benchmark_endpoint(token: str, path: str, concurrency: int, duration: float) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    results = {"ok": 0, "errors": 0, "latencies": []}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker, f"{BASE_URL}{path}", headers, deadline, results, lock)
+
+    latencies = sorted(results["latencies"])
+    return {
+        "path": path,
+        "rps": results["ok"] / duration,
+        "errors": results["errors"],
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0,
+    }
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else CONCURRENCY
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else DURATION_SECONDS
+
+    print("=== Бенчмарк запросов к БД (requests/sec) ===")
+    print(f"URL: {BASE_URL}, потоков: {concurrency}, длительность: {duration} с")
+
+    token = get_auth_token(USERNAME, PASSWORD)
+    for path in ENDPOINTS:
+        result = benchmark_endpoint(token, path, concurrency, duration)
+        print(
+            f"{result['path']:<30} {result['rps']:>8.1f} req/s  "
+            f"p50 {result['p50_ms']:.1f} ms  p99 {result['p99_ms']:.1f} ms  ошибок: {result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
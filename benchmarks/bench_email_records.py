@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.api.json_response import model_response
+from app.schemas.email import EmailAttachment, EmailFetchResponse, EmailMessage
+from app.services.email_service import AttachmentRecord, MessageRecord
+
+MESSAGES = 100
+REPEAT = 50
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+BODY = "Здравствуйте! Подскажите, пожалуйста, статус заказа. " * 40
+
+
+def fields(i: int) -> dict:
+    return {
+        "uid": str(i),
+        "subject": f"Вопрос {i}",
+        "from_address": "client@example.com",
+        "to_addresses": ["support@example.com"],
+        "date": NOW,
+        "body_plain": BODY,
+        "body_html": f"<p>{BODY}</p>",
+        "is_read": bool(i % 2),
+    }
+
+
+def pydantic_in_loop(messages: int) -> bytes:
+    # Прежний путь: модели в цикле разбора, затем ответ проверяется по response_model еще раз.
+    emails = [
+        EmailMessage(
+            **fields(i),
+            has_attachments=True,
+            attachments=[EmailAttachment(filename="file.pdf", content_type="application/pdf", size=1024)],
+        )
+        for i in range(messages)
+    ]
+    response = EmailFetchResponse(success=True, message="ok", total_count=len(emails), emails=emails)
+    return EmailFetchResponse.model_validate(response.model_dump()).model_dump_json().encode()
+
+
+def records(messages: int) -> bytes:
+    emails = [
+        MessageRecord(**fields(i), attachments=[AttachmentRecord("file.pdf", "application/pdf", 1024)])
+        for i in range(messages)
+    ]
+    response = EmailFetchResponse.model_construct(
+        success=True, message="ok", total_count=len(emails), emails=[email.to_schema() for email in emails]
+    )
+    return model_response(EmailFetchResponse, response).body
+
+
+def measure(build, messages: int, repeat: int):
+    tracemalloc.start()
+    build(messages)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        build(messages)
+    return (time.perf_counter() - started) / repeat * 1000, peak
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else MESSAGES
+    assert pydantic_in_loop(messages) == records(messages)
+    for label, build in [("pydantic models in loop", pydantic_in_loop), ("slots records", records)]:
+        elapsed, peak = measure(build, messages, REPEAT)
+        print(f"{label:<24} {elapsed:7.2f} ms  peak={peak / 1024:8.1f} KiB  ({messages} messages)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = tempfile.mkdtemp(prefix="bench-login-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DATA_DIR, 'bench.db')}"
+os.environ["ANALYTICS_ROLLUP_ENABLED"] = "False"
+sys.path.insert(0, ROOT_DIR)
+
+import httpx
+from alembic import command
+from alembic.config import Config
+from app.core.database import async_engine
+from app.core.security import pwd_context
+
+LOGINS = 64
+CONCURRENCY = 16
+PASSWORD = "bench-password"
+PROBE_INTERVAL = 0.01
+
+
+async def inline_verify_and_update_password(plain_password, hashed_password):
+    # Прежнее поведение: bcrypt прямо в event loop.
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def run(app, logins: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        health_latencies = []
+        done = asyncio.Event()
+
+        async def login():
+            async with semaphore:
+                response = await client.post("/api/v1/auth/login", data={"username": "bench", "password": PASSWORD})
+                assert response.status_code == 200, response.text
+
+        async def probe_health():
+            # Задержка считается вместе с опозданием пробуждения: блокировка event loop видна и между запросами.
+            while not done.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(PROBE_INTERVAL)
+                await client.get("/health")
+                health_latencies.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+        probe = asyncio.create_task(probe_health())
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe
+    await async_engine.dispose()
+
+    health_latencies.sort()
+    return logins / elapsed, statistics.median(health_latencies), health_latencies[-1]
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else LOGINS
+    command.upgrade(Config(os.path.join(ROOT_DIR, "alembic.ini")), "head")
+
+    from app.api.v1.endpoints import auth
+    from app.core.config import settings
+    from app.core.database import SessionLocal
+    from app.core.security import get_password_hash
+    from app.models.user import User
+    from main import app
+
+    with SessionLocal() as db:
+        db.add(User(email="bench@example.com", username="bench", hashed_password=get_password_hash(PASSWORD)))
+        db.commit()
+
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS}, workers={settings.PASSWORD_HASH_WORKERS}, concurrency={CONCURRENCY}")
+    offloaded = auth.verify_and_update_password
+    for label, verify in [("bcrypt in event loop", inline_verify_and_update_password), ("bcrypt in executor", offloaded)]:
+        auth.verify_and_update_password = verify
+        rate, median, worst = asyncio.run(run(app, logins, CONCURRENCY))
+        print(f"{label:<22} {rate:7.1f} logins/s  /health median={median * 1000:7.1f} ms  max={worst * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from alembic import command
+from alembic.config import Config
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SENT_EMAILS = 100_000
+TEMPLATES = 20
+BATCH_SIZE = 10_000
+
+
+def database_size(path: str) -> int:
+    connection = sqlite3.connect(path)
+    connection.execute("VACUUM")
+    connection.close()
+    return os.path.getsize(path)
+
+
+def backup_seconds(path: str) -> float:
+    source = sqlite3.connect(path)
+    target = sqlite3.connect(path + ".backup")
+    started = time.perf_counter()
+    source.backup(target)
+    elapsed = time.perf_counter() - started
+    source.close()
+    target.close()
+    os.remove(path + ".backup")
+    return elapsed
+
+
+def fill_legacy_schema(path: str, sent_emails: int):
+    rng = random.Random(42)
+    bodies = [f"Здравствуйте! Спасибо за обращение №{i}. " * 40 for i in range(TEMPLATES)]
+
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "INSERT INTO users (email, username, hashed_password, is_active, is_superuser) "
+        "VALUES ('bench@example.com', 'bench', 'x', 1, 0)"
+    )
+    for offset in range(0, sent_emails, BATCH_SIZE):
+        connection.executemany(
+            "INSERT INTO sent_emails (user_id, to_email, subject, body, success) VALUES (1, ?, 'Re: Вопрос', ?, 1)",
+            [
+                (f"client{i}@example.com", rng.choice(bodies))
+                for i in range(offset, min(offset + BATCH_SIZE, sent_emails))
+            ],
+        )
+    connection.commit()
+    connection.close()
+
+
+def report(label: str, path: str):
+    print(f"{label:<28} size={database_size(path) / 1024 / 1024:8.2f} MiB  backup={backup_seconds(path) * 1000:8.1f} ms")
+
+
+def main():
+    sent_emails = int(sys.argv[1]) if len(sys.argv) > 1 else SENT_EMAILS
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-storage-"), "bench.db")
+
+    config = Config(os.path.join(ROOT_DIR, "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+
+    command.upgrade(config, "0002")
+    fill_legacy_schema(path, sent_emails)
+    report("body in sent_emails", path)
+
+    started = time.perf_counter()
+    command.upgrade(config, "head")
+    print(f"migration took {time.perf_counter() - started:.1f} s")
+    report("sent_email_bodies", path)
+
+
+if __name__ == "__main__":
+    main()
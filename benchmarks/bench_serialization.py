@@ -0,0 +1,126 @@
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from app.api.json_response import FastJSONResponse, model_response, orjson
+from app.schemas.analytics import SentEmailTimeSeriesResponse, TimeSeries, TimeSeriesPoint
+from app.schemas.email import EmailAttachment, EmailFetchResponse, EmailMessage
+from app.schemas.response_template import EmailResponseAttachmentResponse, ResponseTemplateResponse
+from app.schemas.sent_email import SentEmailResponse
+
+REPEAT = 20
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+BODY = "Здравствуйте! Спасибо за обращение, мы ответим в течение рабочего дня. " * 40
+
+
+def template(i: int) -> ResponseTemplateResponse:
+    return ResponseTemplateResponse(id=i, user_id=1, title=f"Шаблон {i}", body=BODY[:2000], created_at=NOW)
+
+
+def email_fetch_response() -> EmailFetchResponse:
+    emails = [
+        EmailMessage(
+            uid=str(i),
+            subject=f"Вопрос {i}",
+            from_address="client@example.com",
+            to_addresses=["support@example.com"],
+            date=NOW,
+            body_plain=BODY,
+            body_html=f"<p>{BODY}</p>",
+            has_attachments=True,
+            attachments=[EmailAttachment(filename="file.pdf", content_type="application/pdf", size=1024)],
+        )
+        for i in range(100)
+    ]
+    return EmailFetchResponse(success=True, message="ok", total_count=len(emails), emails=emails)
+
+
+def sent_emails() -> List[SentEmailResponse]:
+    return [
+        SentEmailResponse(
+            id=i, user_id=1, to_email="client@example.com", subject="Re: Вопрос", body=BODY,
+            success=True, sent_at=NOW - timedelta(minutes=i), response_template_id=i % 20,
+        )
+        for i in range(1000)
+    ]
+
+
+def attachments() -> List[EmailResponseAttachmentResponse]:
+    templates = [template(i) for i in range(20)]
+    return [
+        EmailResponseAttachmentResponse(
+            id=i, user_id=1, email_uid=str(i), response_template_id=i % 20, attached_at=NOW,
+            response_template=templates[i % 20],
+        )
+        for i in range(1000)
+    ]
+
+
+def time_series() -> SentEmailTimeSeriesResponse:
+    points = [
+        TimeSeriesPoint(bucket_start=NOW + timedelta(hours=i), total=10, successful=9, failed=1, success_rate=0.9)
+        for i in range(2000)
+    ]
+    return SentEmailTimeSeriesResponse(
+        granularity="hour", group_by="none", start=NOW, end=NOW + timedelta(hours=2000), series=[TimeSeries(points=points)]
+    )
+
+
+CASES = [
+    ("EmailFetchResponse x100", EmailFetchResponse, email_fetch_response),
+    ("List[SentEmailResponse] x1000", List[SentEmailResponse], sent_emails),
+    ("List[ResponseTemplateResponse] x100", List[ResponseTemplateResponse], lambda: [template(i) for i in range(100)]),
+    ("List[EmailResponseAttachmentResponse] x1000", List[EmailResponseAttachmentResponse], attachments),
+    ("SentEmailTimeSeriesResponse x2000", SentEmailTimeSeriesResponse, time_series),
+]
+
+
+def fastapi_default(annotation, content) -> bytes:
+    # Путь FastAPI для обычного return: model_dump, проверка по response_model, jsonable_encoder, json.dumps.
+    field = create_model_field(name="Response", type_=annotation, mode="serialization")
+    encoded = asyncio.run(serialize_response(field=field, response_content=content))
+    return JSONResponse(encoded).body
+
+
+def orjson_dump(annotation, content) -> bytes:
+    items = [item.model_dump(mode="json") for item in content] if isinstance(content, list) else content.model_dump(mode="json")
+    return FastJSONResponse(items).body
+
+
+def fast_json(annotation, content) -> bytes:
+    return model_response(annotation, content).body
+
+
+def measure(serialize, annotation, content, repeat: int):
+    body = serialize(annotation, content)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        serialize(annotation, content)
+    return (time.perf_counter() - started) / repeat * 1000, len(body)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else REPEAT
+    paths = [("fastapi default", fastapi_default), ("model_response", fast_json)]
+    if orjson is not None:
+        paths.insert(1, ("orjson(model_dump)", orjson_dump))
+
+    for label, annotation, build in CASES:
+        content = build()
+        print(label)
+        for path, serialize in paths:
+            elapsed, size = measure(serialize, annotation, content, repeat)
+            print(f"  {path:<20} {elapsed:8.2f} ms  {size / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,7 @@
 from sqlalchemy.orm import Session
-from app.core.database import engine, SessionLocal
+from app.core.database import SessionLocal
 from app.models.user import User
 from app.core.security import get_password_hash, encrypt_email_password
-from app.core.database import Base
-
-Base.metadata.create_all(bind=engine)
 
 
 def create_superuser():
@@ -1,11 +1,37 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from app.core.config import settings
 from app.api.v1.router import api_router
-from app.core.database import engine, Base
+from app.core.cache import invalidation_channel
+from app.core.database import async_engine
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import registry
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.query_counter import QueryCounterMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware, create_rate_limit_backend
+from app.services.background_jobs import start_background_jobs
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    invalidation_channel.start()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    tasks = start_background_jobs()
+    yield
+    if settings.LOOP_MONITOR_ENABLED:
+        await loop_monitor.stop()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await async_engine.dispose()
+    await rate_limit_backend.close()
+    invalidation_channel.close()
 
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -14,17 +40,30 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    lifespan=lifespan,
 )
 
+rate_limit_backend = create_rate_limit_backend()
+if settings.RATE_LIMIT_ENABLED:
+    # Добавляется первым, чтобы ответ 429 тоже проходил через CORS.
+    app.add_middleware(RateLimitMiddleware, backend=rate_limit_backend)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
     allow_methods=settings.CORS_ALLOW_METHODS,
     allow_headers=settings.CORS_ALLOW_HEADERS,
+    expose_headers=settings.CORS_EXPOSE_HEADERS,
 )
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(CompressionMiddleware)
+if settings.PROFILING_ENABLED:
+    # Снаружи сжатия, чтобы в профиль попадало и оно.
+    app.add_middleware(ProfilingMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(QueryCounterMiddleware, expose_header=settings.DB_QUERY_COUNT_HEADER)
 app.include_router(api_router, prefix="/api/v1")
 
 
@@ -42,9 +81,16 @@ async def health_check():
     return {"Статус": "Запущен", "Статус разработки": settings.ENVIRONMENT}
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", summary = "Метрики в формате Prometheus", tags = ["Состояние сервера"])
+    async def metrics():
+        return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 if __name__ == "__main__":
     import uvicorn
 
     uvicorn.run(
         "main:app", host=settings.HOST, port=settings.PORT, reload=settings.DEBUG
     )
+
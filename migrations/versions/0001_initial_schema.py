@@ -0,0 +1,158 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 17:10:55.642757
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('email_password', sa.String(), nullable=True),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('full_name', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_superuser', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+
+    op.create_table('response_templates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('send_response', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_response_templates_id'), 'response_templates', ['id'], unique=False)
+    op.create_index(op.f('ix_response_templates_user_id'), 'response_templates', ['user_id'], unique=False)
+
+    op.create_table('sent_email_counters',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_sent', sa.Integer(), nullable=False),
+    sa.Column('successful', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('sent_email_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(length=8), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('response_template_id', sa.Integer(), nullable=True),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('successful', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('granularity', 'bucket_start', 'user_id', 'response_template_id', name='uq_sent_email_rollups_bucket')
+    )
+    op.create_index('ix_sent_email_rollups_granularity_bucket', 'sent_email_rollups', ['granularity', 'bucket_start'], unique=False)
+    op.create_index(op.f('ix_sent_email_rollups_id'), 'sent_email_rollups', ['id'], unique=False)
+    op.create_index('ix_sent_email_rollups_user_granularity_bucket', 'sent_email_rollups', ['user_id', 'granularity', 'bucket_start'], unique=False)
+
+    op.create_table('email_response_attachments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('email_uid', sa.String(), nullable=False),
+    sa.Column('email_subject', sa.String(), nullable=True),
+    sa.Column('email_from', sa.String(), nullable=True),
+    sa.Column('response_template_id', sa.Integer(), nullable=False),
+    sa.Column('attached_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['response_template_id'], ['response_templates.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_email_response_attachments_email_uid'), 'email_response_attachments', ['email_uid'], unique=False)
+    op.create_index(op.f('ix_email_response_attachments_id'), 'email_response_attachments', ['id'], unique=False)
+    op.create_index(op.f('ix_email_response_attachments_user_id'), 'email_response_attachments', ['user_id'], unique=False)
+
+    op.create_table('sent_emails',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('attachment_id', sa.Integer(), nullable=True),
+    sa.Column('to_email', sa.String(), nullable=False),
+    sa.Column('subject', sa.String(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('original_email_uid', sa.String(), nullable=True),
+    sa.Column('original_email_subject', sa.String(), nullable=True),
+    sa.Column('success', sa.Boolean(), nullable=False),
+    sa.Column('smtp_response', sa.Text(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('response_template_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['attachment_id'], ['email_response_attachments.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['response_template_id'], ['response_templates.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sent_emails_attachment_id'), 'sent_emails', ['attachment_id'], unique=False)
+    op.create_index(op.f('ix_sent_emails_id'), 'sent_emails', ['id'], unique=False)
+    op.create_index(op.f('ix_sent_emails_original_email_uid'), 'sent_emails', ['original_email_uid'], unique=False)
+    op.create_index(op.f('ix_sent_emails_to_email'), 'sent_emails', ['to_email'], unique=False)
+    op.create_index(op.f('ix_sent_emails_user_id'), 'sent_emails', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_sent_emails_user_id'), table_name='sent_emails')
+    op.drop_index(op.f('ix_sent_emails_to_email'), table_name='sent_emails')
+    op.drop_index(op.f('ix_sent_emails_original_email_uid'), table_name='sent_emails')
+    op.drop_index(op.f('ix_sent_emails_id'), table_name='sent_emails')
+    op.drop_index(op.f('ix_sent_emails_attachment_id'), table_name='sent_emails')
+
+    op.drop_table('sent_emails')
+    op.drop_index(op.f('ix_email_response_attachments_user_id'), table_name='email_response_attachments')
+    op.drop_index(op.f('ix_email_response_attachments_id'), table_name='email_response_attachments')
+    op.drop_index(op.f('ix_email_response_attachments_email_uid'), table_name='email_response_attachments')
+
+    op.drop_table('email_response_attachments')
+    op.drop_index('ix_sent_email_rollups_user_granularity_bucket', table_name='sent_email_rollups')
+    op.drop_index(op.f('ix_sent_email_rollups_id'), table_name='sent_email_rollups')
+    op.drop_index('ix_sent_email_rollups_granularity_bucket', table_name='sent_email_rollups')
+
+    op.drop_table('sent_email_rollups')
+    op.drop_table('sent_email_counters')
+    op.drop_index(op.f('ix_response_templates_user_id'), table_name='response_templates')
+    op.drop_index(op.f('ix_response_templates_id'), table_name='response_templates')
+
+    op.drop_table('response_templates')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+
+    op.drop_table('users')
+    op.drop_table('rollup_watermarks')
@@ -0,0 +1,42 @@
+"""composite indexes for hot queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 17:12:17.885358
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_email_response_attachments_user_id_email_uid_template', 'email_response_attachments', ['user_id', 'email_uid', 'response_template_id'], unique=False)
+    op.create_index(op.f('ix_email_response_attachments_response_template_id'), 'email_response_attachments', ['response_template_id'], unique=False)
+    op.drop_index(op.f('ix_email_response_attachments_user_id'), table_name='email_response_attachments')
+
+    op.create_index('ix_sent_emails_user_id_sent_at', 'sent_emails', ['user_id', 'sent_at', 'id'], unique=False)
+    op.create_index('ix_sent_emails_user_id_success_sent_at', 'sent_emails', ['user_id', 'success', 'sent_at', 'id'], unique=False)
+    op.create_index(op.f('ix_sent_emails_response_template_id'), 'sent_emails', ['response_template_id'], unique=False)
+    op.drop_index(op.f('ix_sent_emails_user_id'), table_name='sent_emails')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sent_emails_user_id_success_sent_at', table_name='sent_emails')
+    op.drop_index('ix_sent_emails_user_id_sent_at', table_name='sent_emails')
+    op.drop_index(op.f('ix_sent_emails_response_template_id'), table_name='sent_emails')
+    op.create_index(op.f('ix_sent_emails_user_id'), 'sent_emails', ['user_id'], unique=False)
+
+    op.drop_index('ix_email_response_attachments_user_id_email_uid_template', table_name='email_response_attachments')
+    op.drop_index(op.f('ix_email_response_attachments_response_template_id'), table_name='email_response_attachments')
+    op.create_index(op.f('ix_email_response_attachments_user_id'), 'email_response_attachments', ['user_id'], unique=False)
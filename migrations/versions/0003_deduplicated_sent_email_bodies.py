@@ -0,0 +1,139 @@
+"""deduplicated sent email bodies
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 17:41:03.512904
+
+"""
+import hashlib
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core import codecs
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+MIN_COMPRESS_SIZE = 256
+
+sent_emails = sa.table(
+    'sent_emails',
+    sa.column('id', sa.Integer),
+    sa.column('body', sa.Text),
+    sa.column('body_hash', sa.String),
+)
+sent_email_bodies = sa.table(
+    'sent_email_bodies',
+    sa.column('hash', sa.String),
+    sa.column('codec', sa.String),
+    sa.column('content', sa.LargeBinary),
+    sa.column('original_size', sa.Integer),
+)
+
+
+def encode_body(text: str) -> dict:
+    data = text.encode('utf-8')
+    codec, content = 'plain', data
+    if len(data) >= MIN_COMPRESS_SIZE:
+        compressed = zlib.compress(data, 6)
+        if len(compressed) < len(data):
+            codec, content = 'zlib', compressed
+    return {'hash': hashlib.sha256(data).hexdigest(), 'codec': codec, 'content': content, 'original_size': len(data)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sent_email_bodies',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('codec', sa.String(length=16), nullable=False),
+    sa.Column('content', sa.LargeBinary(), nullable=False),
+    sa.Column('original_size', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    with op.batch_alter_table('sent_emails', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('body_hash', sa.String(length=64), nullable=True))
+
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(sent_emails.c.id, sent_emails.c.body)
+            .where(sent_emails.c.id > last_id)
+            .order_by(sent_emails.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        bodies = {}
+        updates = []
+        for row in rows:
+            body = encode_body(row.body)
+            bodies.setdefault(body['hash'], body)
+            updates.append({'row_id': row.id, 'row_hash': body['hash']})
+
+        existing = set(connection.scalars(
+            sa.select(sent_email_bodies.c.hash).where(sent_email_bodies.c.hash.in_(list(bodies)))
+        ))
+        new_bodies = [body for body_hash, body in bodies.items() if body_hash not in existing]
+        if new_bodies:
+            connection.execute(sent_email_bodies.insert(), new_bodies)
+        connection.execute(
+            sent_emails.update()
+            .where(sent_emails.c.id == sa.bindparam('row_id'))
+            .values(body_hash=sa.bindparam('row_hash')),
+            updates,
+        )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('sent_emails', schema=None) as batch_op:
+        batch_op.alter_column('body_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_foreign_key('fk_sent_emails_body_hash_sent_email_bodies', 'sent_email_bodies', ['body_hash'], ['hash'])
+        batch_op.create_index(batch_op.f('ix_sent_emails_body_hash'), ['body_hash'], unique=False)
+        batch_op.drop_column('body')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('sent_emails', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('body', sa.Text(), nullable=True))
+
+    connection = op.get_bind()
+    last_hash = ''
+    while True:
+        rows = connection.execute(
+            sa.select(sent_email_bodies)
+            .where(sent_email_bodies.c.hash > last_hash)
+            .order_by(sent_email_bodies.c.hash)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        connection.execute(
+            sent_emails.update()
+            .where(sent_emails.c.body_hash == sa.bindparam('row_hash'))
+            .values(body=sa.bindparam('row_body')),
+            [
+                {'row_hash': row.hash, 'row_body': codecs.decode(row.content, row.codec).decode('utf-8')}
+                for row in rows
+            ],
+        )
+        last_hash = rows[-1].hash
+
+    with op.batch_alter_table('sent_emails', schema=None) as batch_op:
+        batch_op.alter_column('body', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_index(batch_op.f('ix_sent_emails_body_hash'))
+        batch_op.drop_constraint('fk_sent_emails_body_hash_sent_email_bodies', type_='foreignkey')
+        batch_op.drop_column('body_hash')
+
+    op.drop_table('sent_email_bodies')
@@ -0,0 +1,109 @@
+import os
+import sys
+import tempfile
+from typing import NamedTuple
+
+from helpers import ROOT_DIR
+
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="swtaskmanager-tests-")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DATA_DIR, 'test.db')}"
+os.environ["DEBUG"] = "False"
+os.environ["ANALYTICS_ROLLUP_ENABLED"] = "False"
+os.environ["DB_QUERY_COUNT_HEADER"] = "True"
+os.environ["DB_QUERY_BUDGET_STRICT"] = "True"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["RATE_LIMIT_ENABLED"] = "False"
+sys.path.insert(0, ROOT_DIR)
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "admin-password"
+
+
+@pytest.fixture(scope="session")
+def migrated_db():
+    command.upgrade(Config(os.path.join(ROOT_DIR, "alembic.ini")), "head")
+
+
+@pytest.fixture(scope="session")
+def client(migrated_db):
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def superuser(migrated_db) -> int:
+    from app.core.database import SessionLocal
+    from app.core.security import get_password_hash
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        user = User(
+            email="admin@example.com",
+            username=ADMIN_USERNAME,
+            hashed_password=get_password_hash(ADMIN_PASSWORD),
+            is_active=True,
+            is_superuser=True,
+        )
+        db.add(user)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client, superuser) -> dict:
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD},
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class RegisteredUser(NamedTuple):
+    id: int
+    username: str
+    password: str
+    headers: dict
+
+
+@pytest.fixture
+def create_user(client, auth_headers):
+    # Фабрика обычных пользователей: регистрирует и входит от имени пользователя,
+    # после теста удаляет всех созданных вместе с историей их писем.
+    from sqlalchemy import delete
+    from app.core.database import engine
+    from app.models import SentEmail, SentEmailCounter
+
+    created = []
+
+    def create(username: str, **fields) -> RegisteredUser:
+        password = fields.pop("password", f"{username}-password")
+        response = client.post(
+            "/api/v1/auth/users/register",
+            headers=auth_headers,
+            json={"email": f"{username}@example.com", "username": username, "password": password, **fields},
+        )
+        assert response.status_code == 201, response.text
+        user_id = response.json()["id"]
+        created.append(user_id)
+        response = client.post("/api/v1/auth/login", data={"username": username, "password": password})
+        assert response.status_code == 200, response.text
+        return RegisteredUser(user_id, username, password, {"Authorization": f"Bearer {response.json()['access_token']}"})
+
+    yield create
+    with engine.begin() as connection:
+        connection.execute(delete(SentEmail).where(SentEmail.user_id.in_(created)))
+        connection.execute(delete(SentEmailCounter).where(SentEmailCounter.user_id.in_(created)))
+    for user_id in created:
+        client.delete(f"/api/v1/users/user/delete/{user_id}", headers=auth_headers)
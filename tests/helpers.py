@@ -0,0 +1,30 @@
+import os
+from email.message import EmailMessage as MimeMessage
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeImapConnection:
+    def __init__(self, messages):
+        self.messages = messages
+
+    def select(self, folder, readonly=False):
+        return "OK", [str(len(self.messages)).encode()]
+
+    def search(self, charset, criteria):
+        return "OK", [b" ".join(str(i + 1).encode() for i in range(len(self.messages)))]
+
+    def fetch(self, email_id, parts):
+        message = self.messages[int(email_id) - 1]
+        return "OK", [(b"1 (FLAGS (\\Seen) RFC822 {1}", message.as_bytes()), b")"]
+
+
+def mime_message(subject: str) -> MimeMessage:
+    message = MimeMessage()
+    message["Subject"] = subject
+    message["From"] = "Клиент <client@example.com>"
+    message["To"] = "support@example.com, sales@example.com"
+    message["Date"] = "Mon, 05 Jan 2026 10:00:00 +0300"
+    message.set_content("Текст письма")
+    message.add_attachment(b"%PDF", maintype="application", subtype="pdf", filename="file.pdf")
+    return message
@@ -0,0 +1,73 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.models import SentEmail, User
+from app.models.sent_email import insert_sent_email_body
+from app.services.analytics_service import SentEmailRollupService
+from helpers import ROOT_DIR
+
+DAY = datetime(2026, 6, 15, tzinfo=timezone.utc)
+# (час отправки, успех): по два письма в 09:00, 10:00 и 12:00.
+SENT = [(9, True), (9, False), (10, True), (10, True), (12, False), (12, True)]
+
+
+@pytest.fixture
+def analytics_db(tmp_path):
+    url = f"sqlite:///{tmp_path / 'analytics.db'}"
+    config = Config(os.path.join(ROOT_DIR, "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        user_id = connection.execute(
+            insert(User).values(email="analytics@example.com", username="analytics", hashed_password="x", is_active=True)
+        ).inserted_primary_key[0]
+        body_hash = insert_sent_email_body(connection, "Текст")
+        connection.execute(
+            insert(SentEmail),
+            [
+                {
+                    "user_id": user_id,
+                    "to_email": "client@example.com",
+                    "subject": "Re",
+                    "body_hash": body_hash,
+                    "success": success,
+                    "sent_at": DAY + timedelta(hours=hour, minutes=15),
+                }
+                for hour, success in SENT
+            ],
+        )
+
+    with Session(engine) as db:
+        SentEmailRollupService(db, lag_seconds=0).refresh()
+        yield db
+    engine.dispose()
+
+
+def totals(series):
+    return [(point.bucket_start.hour, point.total, point.successful, point.failed) for point in series[0].points]
+
+
+def test_unaligned_start_includes_first_bucket(analytics_db):
+    series = SentEmailRollupService(analytics_db).get_time_series(
+        "hour", start=DAY + timedelta(hours=9, minutes=40), end=DAY + timedelta(hours=13)
+    )
+
+    assert totals(series) == [(9, 2, 1, 1), (10, 2, 2, 0), (11, 0, 0, 0), (12, 2, 1, 1)]
+
+
+def test_unaligned_start_matches_aligned_start(analytics_db):
+    service = SentEmailRollupService(analytics_db)
+    end = DAY + timedelta(days=1)
+
+    aligned = service.get_time_series("day", start=DAY, end=end)
+    unaligned = service.get_time_series("day", start=DAY + timedelta(hours=10, minutes=5), end=end)
+
+    assert totals(unaligned) == totals(aligned) == [(0, 6, 4, 2)]
@@ -0,0 +1,131 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, negotiate_encoding
+
+PAYLOAD = {"body": "Здравствуйте! Спасибо за обращение. " * 200}
+
+
+@pytest.fixture
+def offloaded(monkeypatch):
+    calls = []
+    run_in_threadpool = compression.run_in_threadpool
+
+    async def recording(function, *args):
+        calls.append(len(args[-1]))
+        return await run_in_threadpool(function, *args)
+
+    monkeypatch.setattr(compression, "run_in_threadpool", recording)
+    return calls
+
+
+@pytest.fixture
+def compressed_client():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast():
+        return PAYLOAD
+
+    @app.get("/raw")
+    async def raw():
+        return PAYLOAD
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(5):
+                yield f"строка {i} ".encode() * 100
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=500,
+        offload_size=4000,
+        encodings=["zstd", "br", "gzip"],
+        levels={"zstd": 3, "br": 4, "gzip": 6},
+        route_levels={"/fast": {"zstd": 0, "br": 0, "gzip": 1}},
+        excluded_routes=["/raw"],
+    )
+    return TestClient(app)
+
+
+def test_negotiate_encoding():
+    preference = ["gzip"]
+    assert negotiate_encoding("gzip, deflate", preference) == "gzip"
+    assert negotiate_encoding("deflate", preference) is None
+    assert negotiate_encoding("gzip;q=0", preference) is None
+    assert negotiate_encoding("*", preference) == "gzip"
+    assert negotiate_encoding("", preference) is None
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="brotli не установлен")
+def test_negotiate_encoding_prefers_highest_quality_then_server_order():
+    preference = ["br", "gzip"]
+    assert negotiate_encoding("gzip, br", preference) == "br"
+    assert negotiate_encoding("gzip;q=1, br;q=0.5", preference) == "gzip"
+    assert negotiate_encoding("br;q=0, *", preference) == "gzip"
+
+
+def test_gzip_response(compressed_client):
+    response = compressed_client.get("/items/1", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert int(response.headers["Content-Length"]) < len(response.content)
+    assert response.json() == PAYLOAD
+
+
+@pytest.mark.parametrize("encoding", [name for name in ("br", "zstd") if name in compression.ENCODERS])
+def test_optional_encodings(compressed_client, encoding):
+    response = compressed_client.get("/items/1", headers={"Accept-Encoding": f"gzip, {encoding}"})
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.json() == PAYLOAD
+
+
+def test_small_and_unsupported_responses_are_not_compressed(compressed_client):
+    response = compressed_client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+
+    response = compressed_client.get("/items/1", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.json() == PAYLOAD
+
+
+def test_route_levels_and_exclusions(compressed_client):
+    response = compressed_client.get("/fast", headers={"Accept-Encoding": "zstd, br, gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+
+    response = compressed_client.get("/raw", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert "Vary" not in response.headers
+
+
+def test_streaming_response_is_compressed_per_chunk(compressed_client, offloaded):
+    with compressed_client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in response.headers
+        text = response.read().decode()
+    assert text == "".join(f"строка {i} " * 100 for i in range(5))
+    assert offloaded == []
+
+
+def test_large_body_is_compressed_in_threadpool(compressed_client, offloaded):
+    compressed_client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert offloaded == []
+
+    response = compressed_client.get("/items/1", headers={"Accept-Encoding": "gzip"})
+    assert response.json() == PAYLOAD
+    assert offloaded == [len(response.content)]
@@ -0,0 +1,65 @@
+import pytest
+
+from app.api.pagination import encode_cursor
+from app.core.database import SessionLocal
+from app.models import SentEmail
+
+API = "/api/v1"
+
+
+def etag_of(client, headers, url) -> str:
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["ETag"].startswith('W/"')
+    return response.headers["ETag"]
+
+
+def is_not_modified(client, headers, url, if_none_match) -> bool:
+    response = client.get(url, headers={**headers, "If-None-Match": if_none_match})
+    if response.status_code == 304:
+        assert response.content == b""
+        assert response.headers["ETag"].removeprefix("W/") in if_none_match
+        return True
+    assert response.status_code == 200, response.text
+    return False
+
+
+@pytest.mark.parametrize(
+    "url",
+    [f"{API}/responses/response/all", f"{API}/responses/sent-emails/stats", f"{API}/users/me"],
+)
+def test_matching_etag_returns_304(client, auth_headers, url):
+    etag = etag_of(client, auth_headers, url)
+    assert is_not_modified(client, auth_headers, url, etag)
+    assert is_not_modified(client, auth_headers, url, f'"other", {etag.removeprefix("W/")}')
+    assert not is_not_modified(client, auth_headers, url, 'W/"other"')
+
+
+def test_template_update_changes_list_etag(client, auth_headers):
+    template = client.post(
+        f"{API}/responses/response/create", headers=auth_headers, json={"title": "ETag", "body": "Текст"}
+    ).json()
+    # Страница, начинающаяся с нового шаблона: другие тесты могут создать больше шаблонов, чем помещается в первую.
+    url = f"{API}/responses/response/all?cursor={encode_cursor(template['id'] - 1)}"
+    etag = etag_of(client, auth_headers, url)
+
+    client.put(f"{API}/responses/response/{template['id']}", headers=auth_headers, json={"body": "Новый текст"})
+    assert not is_not_modified(client, auth_headers, url, etag)
+
+
+def test_sent_email_changes_stats_etag(client, auth_headers, superuser):
+    url = f"{API}/responses/sent-emails/stats"
+    etag = etag_of(client, auth_headers, url)
+
+    with SessionLocal() as db:
+        db.add(SentEmail(user_id=superuser, to_email="client@example.com", subject="Re: ETag", body="Текст", success=True))
+        db.commit()
+    assert not is_not_modified(client, auth_headers, url, etag)
+
+
+def test_profile_update_changes_me_etag(client, auth_headers, superuser):
+    url = f"{API}/users/me"
+    etag = etag_of(client, auth_headers, url)
+
+    client.patch(f"{API}/users/user/update/{superuser}", headers=auth_headers, json={"full_name": "Администратор"})
+    assert not is_not_modified(client, auth_headers, url, etag)
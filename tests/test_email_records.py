@@ -0,0 +1,22 @@
+from app.api.json_response import model_response
+from app.schemas.email import EmailFetchResponse
+from app.services.email_service import EmailService, MessageRecord
+from helpers import FakeImapConnection, mime_message
+
+
+def test_fetch_returns_records_that_serialize_like_validated_models():
+    service = EmailService("support@example.com", "password")
+    service.connection = FakeImapConnection([mime_message("Первое"), mime_message("Второе")])
+
+    records = service.fetch_emails(limit=10)
+    assert all(isinstance(record, MessageRecord) for record in records)
+    assert [record.subject for record in records] == ["Второе", "Первое"]
+
+    constructed = EmailFetchResponse.model_construct(
+        success=True, message="ok", total_count=len(records), emails=[record.to_schema() for record in records]
+    )
+    validated = EmailFetchResponse.model_validate(constructed.model_dump())
+    assert model_response(EmailFetchResponse, constructed).body == validated.model_dump_json().encode()
+    assert validated.emails[0].has_attachments
+    assert validated.emails[0].attachments[0].filename == "file.pdf"
+    assert validated.emails[0].to_addresses == ["support@example.com", "sales@example.com"]
@@ -0,0 +1,115 @@
+import asyncio
+import imaplib
+import logging
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.config import settings
+from app.core.loop_monitor import LoopLagMonitor, loop_monitor
+from helpers import FakeImapConnection, mime_message
+
+API = "/api/v1"
+NETWORK_DELAY = 0.2
+
+
+def block_loop(seconds: float):
+    time.sleep(seconds)
+
+
+def test_monitor_reports_blocking_call_site(caplog):
+    async def scenario():
+        monitor = LoopLagMonitor(interval=0.02, threshold=0.05)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        block_loop(0.3)
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor
+
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"):
+        monitor = asyncio.run(scenario())
+
+    assert monitor.blocked == 1
+    assert monitor.max_lag >= 0.25
+    assert "tests/test_loop_monitor.py:" in caplog.text
+    assert "block_loop" in caplog.text
+
+
+class SlowImapConnection(FakeImapConnection):
+    # Имитирует сетевые задержки: каждый вызов блокирует поток, как настоящий imaplib.
+    def __init__(self, server, port):
+        time.sleep(NETWORK_DELAY)
+        super().__init__([mime_message("Вопрос"), mime_message("Еще вопрос")])
+
+    def login(self, username, password):
+        time.sleep(NETWORK_DELAY)
+
+    def fetch(self, email_id, parts):
+        time.sleep(NETWORK_DELAY / 4)
+        return super().fetch(email_id, parts)
+
+    def list(self):
+        time.sleep(NETWORK_DELAY)
+        return "OK", [b'(\\HasNoChildren) "/" "INBOX"']
+
+    def close(self):
+        pass
+
+    def logout(self):
+        time.sleep(NETWORK_DELAY / 4)
+
+
+class SlowSMTP:
+    def __init__(self, server, port):
+        time.sleep(NETWORK_DELAY)
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        time.sleep(NETWORK_DELAY)
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def mailbox_user_headers(create_user, monkeypatch):
+    monkeypatch.setattr(imaplib, "IMAP4_SSL", SlowImapConnection)
+    monkeypatch.setattr(smtplib, "SMTP", SlowSMTP)
+    monkeypatch.setattr(settings, "SMTP_USERNAME", "support@example.com")
+    monkeypatch.setattr(settings, "SMTP_PASSWORD", "smtp-password")
+    return create_user("mailbox", email_password="secret").headers
+
+
+def test_mail_endpoints_do_not_block_the_event_loop_under_load(client, mailbox_user_headers):
+    # Нагрузочный тест: почтовые эндпоинты с медленной "сетью" вперемешку с быстрыми запросами.
+    # Если IMAP или SMTP снова начнут вызываться прямо в цикле событий, монитор это зафиксирует.
+    requests = [
+        ("POST", f"{API}/emails/fetch", {"limit": 5}),
+        ("GET", f"{API}/emails/email/folders", None),
+        ("POST", f"{API}/emails/email/test/connection", None),
+        ("POST", f"{API}/responses/smtp/test", None),
+        ("GET", f"{API}/users/me", None),
+        ("GET", f"{API}/responses/response/all", None),
+    ] * 4
+
+    def send(request):
+        method, url, body = request
+        return client.request(method, url, headers=mailbox_user_headers, json=body)
+
+    assert loop_monitor.last_beat > 0
+    blocked_before = loop_monitor.blocked
+    loop_monitor.max_lag = 0.0
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        responses = list(executor.map(send, requests))
+
+    assert [response.status_code for response in responses] == [200] * len(requests)
+    assert responses[0].json()["total_count"] == 2
+    assert responses[3].json()["success"]
+    assert loop_monitor.blocked == blocked_before
+    assert loop_monitor.max_lag < settings.LOOP_MONITOR_THRESHOLD_SECONDS
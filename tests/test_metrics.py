@@ -0,0 +1,131 @@
+import smtplib
+import threading
+import time
+
+from app.core.metrics import MetricsRegistry, registry
+from app.services.email_service import EmailService
+from app.services.smtp_service import SMTPService
+from helpers import FakeImapConnection, mime_message
+
+
+def sample(name: str, **labels) -> float:
+    # Значение одной строки из текста /metrics.
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    prefix = f"{name}{{{label_text}}} " if labels else f"{name} "
+    for line in registry.render().splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return 0.0
+
+
+def test_counter_and_histogram_render_prometheus_text():
+    metrics = MetricsRegistry()
+    requests = metrics.counter("requests_total", "Запросы", ("route",))
+    latency = metrics.histogram("latency_seconds", "Задержка", ("route",), buckets=(0.1, 1.0))
+    requests.inc('/a"b')
+    requests.inc('/a"b', amount=2)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, "/a")
+
+    assert metrics.render().splitlines() == [
+        "# HELP requests_total Запросы",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 3',
+        "# HELP latency_seconds Задержка",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1.0"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_threads_write_to_own_shards_and_are_summed():
+    counter = MetricsRegistry().counter("events_total", "События")
+    latency = MetricsRegistry().histogram("latency_seconds", "Задержка", buckets=(0.1, 1.0))
+    stop = threading.Event()
+
+    def work():
+        for _ in range(1000):
+            counter.inc()
+            latency.observe(0.5)
+        stop.wait()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while counter.collect() != {(): 4000}:
+        time.sleep(0.01)
+
+    assert len(counter._shards.shards) == 4
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert counter.collect() == {(): 4000}
+    assert latency.collect() == {(): [0, 4000, 0, 2000.0]}
+
+
+def test_shards_of_finished_threads_are_folded():
+    # Пул потоков заменяет простаивающие потоки новыми: словари завершившихся не должны копиться.
+    counter = MetricsRegistry().counter("events_total", "События", ("route",))
+
+    for _ in range(50):
+        thread = threading.Thread(target=lambda: counter.inc("/a", amount=2))
+        thread.start()
+        thread.join()
+        counter.collect()
+    counter.inc("/b")
+
+    assert counter.collect() == {("/a",): 100, ("/b",): 1}
+    assert list(counter._shards.shards) == [threading.current_thread()]
+
+
+def test_request_and_db_metrics(client, auth_headers):
+    labels = {"method": "GET", "route": "/api/v1/users/me", "status": "200"}
+    requests_before = sample("http_request_duration_seconds_count", **labels)
+    queries_before = sample("db_queries_per_request_count", route="/api/v1/users/me")
+
+    assert client.get("/api/v1/users/me", headers=auth_headers).status_code == 200
+
+    assert sample("http_request_duration_seconds_count", **labels) == requests_before + 1
+    assert sample("db_queries_per_request_count", route="/api/v1/users/me") == queries_before + 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE db_pool_connections gauge" in response.text
+    assert "# TYPE db_query_duration_seconds histogram" in response.text
+
+
+def test_imap_operations_are_counted():
+    fetches_before = sample("imap_operations_total", operation="fetch", outcome="ok")
+    service = EmailService("support@example.com", "password")
+    service.connection = FakeImapConnection([mime_message("Первое"), mime_message("Второе")])
+
+    assert len(service.fetch_emails(limit=10)) == 2
+    assert sample("imap_operations_total", operation="fetch", outcome="ok") == fetches_before + 2
+    assert sample("imap_operation_duration_seconds_count", operation="search") >= 1
+
+
+def test_smtp_outcomes_are_counted(monkeypatch):
+    class RejectingSMTP:
+        def __init__(self, server, port):
+            pass
+
+        def starttls(self):
+            pass
+
+        def login(self, username, password):
+            raise smtplib.SMTPAuthenticationError(535, b"Authentication failed")
+
+    monkeypatch.setattr(smtplib, "SMTP", RejectingSMTP)
+    before = sample("smtp_sends_total", outcome="auth_error")
+
+    service = SMTPService(username="user", password="password", from_email="support@example.com")
+    success, _ = service.send_email("client@example.com", "Тема", "Текст")
+
+    assert not success
+    assert sample("smtp_sends_total", outcome="auth_error") == before + 1
+    assert sample("smtp_send_duration_seconds_count", outcome="auth_error") >= 1
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.database import engine
+from app.models import ResponseTemplate, SentEmail
+from app.models.sent_email import insert_sent_email_body
+
+PAGE_SIZE = 250
+LIST_ENDPOINTS = [
+    ("/api/v1/users/user/get/all", {}),
+    ("/api/v1/responses/response/all", {}),
+    ("/api/v1/responses/response/attachments/all", {}),
+    ("/api/v1/responses/sent-emails/all", {}),
+    ("/api/v1/responses/sent-emails/all", {"success_only": True}),
+]
+
+
+@pytest.fixture(scope="module")
+def tied_sent_emails(superuser):
+    sent_at = datetime.now(timezone.utc).replace(microsecond=0)
+
+    with engine.begin() as connection:
+        template_id = connection.execute(
+            insert(ResponseTemplate).values(user_id=superuser, title="Пагинация", body="Текст")
+        ).inserted_primary_key[0]
+        body_hash = insert_sent_email_body(connection, "Текст")
+        connection.execute(
+            insert(SentEmail),
+            [
+                {
+                    "user_id": superuser,
+                    "to_email": "client@example.com",
+                    "subject": "Re: Пагинация",
+                    "body_hash": body_hash,
+                    "success": bool(i % 3),
+                    "sent_at": sent_at - timedelta(seconds=i // 10),
+                    "response_template_id": template_id,
+                }
+                for i in range(PAGE_SIZE * 2 + 7)
+            ],
+        )
+
+
+def collect_pages(client, headers, url, params, use_cursor):
+    ids = []
+    query = {**params, "limit": PAGE_SIZE}
+    while True:
+        response = client.get(url, headers=headers, params=query)
+        assert response.status_code == 200, response.text
+        page = [item["id"] for item in response.json()]
+        ids.extend(page)
+
+        if use_cursor:
+            if "X-Next-Cursor" not in response.headers:
+                return ids
+            query = {**params, "limit": PAGE_SIZE, "cursor": response.headers["X-Next-Cursor"]}
+        else:
+            if len(page) < PAGE_SIZE:
+                return ids
+            query = {**params, "limit": PAGE_SIZE, "skip": len(ids)}
+
+
+@pytest.mark.parametrize("url,params", LIST_ENDPOINTS)
+def test_cursor_pages_match_offset_pages(client, auth_headers, tied_sent_emails, url, params):
+    by_cursor = collect_pages(client, auth_headers, url, params, use_cursor=True)
+    by_offset = collect_pages(client, auth_headers, url, params, use_cursor=False)
+
+    assert by_cursor == by_offset
+    assert len(by_cursor) == len(set(by_cursor))
+
+
+def test_invalid_cursor_is_rejected(client, auth_headers):
+    response = client.get(
+        "/api/v1/responses/sent-emails/all", headers=auth_headers, params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
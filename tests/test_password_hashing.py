@@ -0,0 +1,31 @@
+from passlib.context import CryptContext
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.core.security import pwd_context
+from app.models.user import User
+
+PASSWORD = "legacy-password"
+
+
+def test_login_rehashes_legacy_cost(client):
+    legacy_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5)
+    with SessionLocal() as db:
+        db.add(User(email="legacy@example.com", username="legacy", hashed_password=legacy_context.hash(PASSWORD)))
+        db.commit()
+
+    response = client.post("/api/v1/auth/login", data={"username": "legacy", "password": PASSWORD})
+    assert response.status_code == 200, response.text
+
+    with SessionLocal() as db:
+        hashed_password = db.scalar(select(User.hashed_password).where(User.username == "legacy"))
+    assert not pwd_context.needs_update(hashed_password)
+    assert pwd_context.verify(PASSWORD, hashed_password)
+
+
+def test_wrong_password_is_rejected(client):
+    response = client.post("/api/v1/auth/login", data={"username": "legacy", "password": "wrong-password"})
+    assert response.status_code == 401
+
+    response = client.post("/api/v1/auth/login", data={"username": "nobody", "password": PASSWORD})
+    assert response.status_code == 401
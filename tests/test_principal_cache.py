@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import event
+
+from app.core.cache import MISSING
+from app.core.database import async_engine
+from app.services.principal_cache import principal_cache
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def user_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+
+def test_authenticated_user_is_cached(client, create_user, user_statements):
+    headers = create_user("member").headers
+    client.get(f"{API}/users/me", headers=headers)
+    user_statements.clear()
+
+    assert client.get(f"{API}/users/me", headers=headers).json()["username"] == "member"
+    assert user_statements == []
+
+
+def test_deactivation_applies_immediately(client, auth_headers, create_user):
+    user_id, _, _, headers = create_user("member")
+    assert client.get(f"{API}/users/me", headers=headers).status_code == 200
+
+    client.patch(f"{API}/users/user/deactivate/{user_id}", headers=auth_headers)
+    assert client.get(f"{API}/users/me", headers=headers).status_code == 400
+
+    client.patch(f"{API}/users/user/activate/{user_id}", headers=auth_headers)
+    assert client.get(f"{API}/users/me", headers=headers).status_code == 200
+
+
+def test_update_applies_immediately(client, auth_headers, create_user):
+    user_id, _, _, headers = create_user("member")
+    client.get(f"{API}/users/me", headers=headers)
+
+    client.patch(f"{API}/users/user/update/{user_id}", headers=auth_headers, json={"full_name": "Сотрудник"})
+    assert client.get(f"{API}/users/me", headers=headers).json()["full_name"] == "Сотрудник"
+
+    client.patch(f"{API}/users/user/update/{user_id}", headers=auth_headers, json={"username": "member2"})
+    assert client.get(f"{API}/users/me", headers=headers).status_code == 401
+    assert principal_cache.users.get("member") is MISSING
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from app.core.profiler import SamplingProfiler
+from app.middleware import profiling
+
+API = "/api/v1"
+
+
+def busy(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampling_profiler_collects_collapsed_stacks():
+    profiler = SamplingProfiler(0.001)
+    profiler.start()
+    busy(0.1)
+    profiler.stop()
+
+    assert profiler.samples > 0
+    lines = profiler.collapsed().splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("busy (" in line and "test_profiling.py:" in line for line in lines)
+    assert all(line.split(";", 1)[0] != "sampling-profiler" for line in lines)
+
+
+@pytest.mark.parametrize("flag", [{"headers": {"X-Profile": "1"}}, {"params": {"profile": "1"}}])
+def test_superuser_receives_profile(client, auth_headers, flag):
+    response = client.get(
+        f"{API}/users/me", headers={**auth_headers, **flag.get("headers", {})}, params=flag.get("params")
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Disposition"].startswith('attachment; filename="profile-api-v1-users-me-')
+    assert response.headers["X-Profile-Status"] == "200"
+    assert int(response.headers["X-Profile-Samples"]) >= 0
+    assert "username" not in response.text
+
+
+def test_profile_flag_requires_superuser(client, create_user):
+    regular_user_headers = create_user("profile").headers
+    response = client.get(f"{API}/users/me", headers={**regular_user_headers, "X-Profile": "1"})
+    assert response.status_code == 403
+
+    response = client.get(f"{API}/users/me", headers={"X-Profile": "1"})
+    assert response.status_code == 401
+
+    response = client.get(f"{API}/users/me", headers=regular_user_headers)
+    assert response.status_code == 200
+    assert response.json()["username"] == "profile"
+
+
+def test_profiles_do_not_overlap(client, auth_headers):
+    assert profiling.profile_lock.acquire(blocking=False)
+    try:
+        response = client.get(f"{API}/users/me", headers={**auth_headers, "X-Profile": "1"})
+        assert response.status_code == 409
+    finally:
+        profiling.profile_lock.release()
+
+
+def test_disabled_flag_values_are_ignored(client, auth_headers):
+    response = client.get(f"{API}/users/me", headers={**auth_headers, "X-Profile": "0"}, params={"profile": "0"})
+    assert response.json()["username"] == "admin"
@@ -0,0 +1,70 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.metrics import DB_QUERY_BUDGET_EXCEEDED
+from app.core.query_counter import QueryBudgetExceeded, count_queries, parameter_shape
+from app.middleware.query_counter import QueryCounterMiddleware
+
+
+@pytest.fixture
+def budget_client():
+    app = FastAPI()
+
+    @app.get("/queries/{count}")
+    async def run_queries(count: int):
+        async with AsyncSessionLocal() as db:
+            for _ in range(count):
+                await db.execute(text("SELECT 1"))
+        return {"count": count}
+
+    app.add_middleware(QueryCounterMiddleware, expose_header=True, budget=2, route_budgets={"/other": 0})
+    return TestClient(app)
+
+
+def test_parameter_shape_hides_values():
+    assert parameter_shape(("secret", 5, None)) == "(str[6], int, NoneType)"
+    assert parameter_shape({"email": "a@b.c", "id": 1}) == "{email: str[5], id: int}"
+    assert parameter_shape([(1, "ab"), (2, "cd")], executemany=True) == "2 x (int, str[2])"
+    assert parameter_shape(tuple(range(25))).endswith(", ... +5)")
+
+
+def test_budget_fails_request_in_strict_mode(budget_client):
+    assert settings.DB_QUERY_BUDGET_STRICT
+    assert budget_client.get("/queries/2").headers["X-DB-Query-Count"] == "2"
+    with pytest.raises(QueryBudgetExceeded, match="/queries/\\{count\\}"):
+        budget_client.get("/queries/3")
+
+
+def test_budget_warns_once_outside_strict_mode(budget_client, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET_STRICT", False)
+    before = DB_QUERY_BUDGET_EXCEEDED.collect().get(("/queries/{count}",), 0)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.query_counter"):
+        response = budget_client.get("/queries/5")
+
+    assert response.headers["X-DB-Query-Count"] == "5"
+    assert caplog.text.count("превысил бюджет в 2 SQL-запросов") == 1
+    assert DB_QUERY_BUDGET_EXCEEDED.collect()[("/queries/{count}",)] == before + 1
+
+
+def test_slow_queries_are_logged_with_route_and_parameter_shape(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_SECONDS", 1e-9)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.query_counter"):
+        with count_queries(route="/api/v1/users/me"), engine.connect() as connection:
+            connection.execute(text("SELECT :value"), {"value": "secret"})
+
+    assert "маршрут /api/v1/users/me, параметры (str[6]): SELECT ?" in caplog.text
+    assert "secret" not in caplog.text
+
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_SECONDS", 0)
+    caplog.clear()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert "Медленный SQL-запрос" not in caplog.text
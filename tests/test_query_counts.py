@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import insert
+
+from app.core.database import engine
+from app.models import EmailResponseAttachment, ResponseTemplate, SentEmail
+from app.models.sent_email import insert_sent_email_body
+
+EMAIL_UID = "n-plus-one"
+
+
+@pytest.fixture(scope="module")
+def attached_templates(superuser):
+    with engine.begin() as connection:
+        template_ids = [
+            connection.execute(
+                insert(ResponseTemplate).values(user_id=superuser, title=f"Шаблон {i}", body="Текст")
+            ).inserted_primary_key[0]
+            for i in range(5)
+        ]
+        connection.execute(
+            insert(EmailResponseAttachment),
+            [
+                {
+                    "user_id": superuser,
+                    "email_uid": EMAIL_UID if i % 2 else f"{EMAIL_UID}-{i}",
+                    "response_template_id": template_ids[i % len(template_ids)],
+                }
+                for i in range(40)
+            ],
+        )
+        body_hash = insert_sent_email_body(connection, "Текст")
+        connection.execute(
+            insert(SentEmail),
+            [
+                {
+                    "user_id": superuser,
+                    "to_email": "client@example.com",
+                    "subject": "Re: Вопрос",
+                    "body_hash": body_hash,
+                    "success": True,
+                    "response_template_id": template_ids[i % len(template_ids)],
+                }
+                for i in range(40)
+            ],
+        )
+    return template_ids
+
+
+@pytest.fixture(autouse=True)
+def cached_principal(client, auth_headers):
+    # Текущий пользователь берется из кэша: бюджеты ниже не включают запрос к users.
+    client.get("/api/v1/users/me", headers=auth_headers)
+
+
+def query_count(client, headers, url, **params):
+    response = client.get(url, headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return int(response.headers["X-DB-Query-Count"])
+
+
+@pytest.mark.parametrize(
+    "url,budget",
+    [
+        ("/api/v1/users/user/get/all", 1),
+        ("/api/v1/responses/response/all", 1),
+        ("/api/v1/responses/response/attachments/all", 1),
+        ("/api/v1/responses/sent-emails/all", 2),
+    ],
+)
+def test_list_query_count_does_not_grow_with_page_size(client, auth_headers, attached_templates, url, budget):
+    small_page = query_count(client, auth_headers, url, limit=2)
+    large_page = query_count(client, auth_headers, url, limit=40)
+
+    assert small_page == large_page
+    assert large_page <= budget
+
+
+def test_attachments_by_email_load_templates_eagerly(client, auth_headers, attached_templates):
+    url = f"/api/v1/responses/response/attachments/email/{EMAIL_UID}"
+    assert query_count(client, auth_headers, url) <= 1
+
+
+def test_attachments_by_template_reuse_template(client, auth_headers, attached_templates):
+    url = f"/api/v1/responses/response/attachments/template/{attached_templates[0]}"
+    assert query_count(client, auth_headers, url) <= 2
+
+
+def test_stats_query_count(client, auth_headers, attached_templates):
+    url = "/api/v1/responses/sent-emails/stats"
+    query_count(client, auth_headers, url)
+    assert query_count(client, auth_headers, url) <= 3
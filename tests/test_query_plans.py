@@ -0,0 +1,219 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, insert, text
+
+from app.core.database import async_engine, engine
+from app.models import EmailResponseAttachment, ResponseTemplate, SentEmail, User
+from app.models.sent_email import insert_sent_email_body
+
+SEED_USERS = 50
+SEED_TEMPLATES = 400
+SEED_BODIES = SEED_TEMPLATES * 10
+SEED_ATTACHMENTS = 5000
+SEED_SENT_EMAILS = 20000
+CHECKED_STATEMENTS = ("SELECT", "UPDATE", "DELETE")
+
+
+@pytest.fixture(scope="module")
+def seeded(superuser):
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+
+    with engine.begin() as connection:
+        user_ids = [superuser] + [
+            connection.execute(
+                insert(User).values(
+                    email=f"user{i}@example.com",
+                    username=f"user{i}",
+                    hashed_password="not-a-real-hash",
+                    is_active=True,
+                    is_superuser=False,
+                )
+            ).inserted_primary_key[0]
+            for i in range(SEED_USERS)
+        ]
+        template_ids = [
+            connection.execute(
+                insert(ResponseTemplate).values(
+                    user_id=rng.choice(user_ids),
+                    title=f"Шаблон {i}",
+                    body="Текст ответа " * 20,
+                    send_response=bool(i % 2),
+                )
+            ).inserted_primary_key[0]
+            for i in range(SEED_TEMPLATES)
+        ]
+        connection.execute(
+            insert(EmailResponseAttachment),
+            [
+                {
+                    "user_id": rng.choice(user_ids),
+                    "email_uid": str(rng.randint(1, 3000)),
+                    "email_subject": "Вопрос",
+                    "email_from": "client@example.com",
+                    "response_template_id": rng.choice(template_ids),
+                }
+                for _ in range(SEED_ATTACHMENTS)
+            ],
+        )
+        body_hashes = [
+            insert_sent_email_body(connection, f"Текст ответа {i} " * 20) for i in range(SEED_BODIES)
+        ]
+        connection.execute(
+            insert(SentEmail),
+            [
+                {
+                    "user_id": superuser if i % 4 == 0 else rng.choice(user_ids),
+                    "attachment_id": rng.randint(1, SEED_ATTACHMENTS),
+                    "to_email": f"client{rng.randint(1, 500)}@example.com",
+                    "subject": "Re: Вопрос",
+                    "body_hash": rng.choice(body_hashes),
+                    "original_email_uid": str(rng.randint(1, 3000)),
+                    "success": rng.random() < 0.9,
+                    "sent_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 60)),
+                    "response_template_id": rng.choice(template_ids),
+                }
+                for i in range(SEED_SENT_EMAILS)
+            ],
+        )
+        connection.execute(text("ANALYZE"))
+
+    return {"user_id": user_ids[1], "template_id": template_ids[0]}
+
+
+@pytest.fixture
+def captured_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(CHECKED_STATEMENTS):
+            statements.append((statement, parameters))
+
+    for target in (async_engine.sync_engine, engine):
+        event.listen(target, "before_cursor_execute", capture)
+    yield statements
+    for target in (async_engine.sync_engine, engine):
+        event.remove(target, "before_cursor_execute", capture)
+
+
+def explain(statement: str, parameters) -> list:
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters or ())).all()
+    return [row[3] for row in rows]
+
+
+def full_scans(statement: str, plan: list) -> list:
+    upper = statement.upper()
+    # Постраничный обход всей таблицы без фильтра и без сортировки во временном B-дереве
+    # ограничен LIMIT и считается допустимым.
+    bounded = " LIMIT " in upper and " WHERE " not in upper and not any("TEMP B-TREE" in step for step in plan)
+    return [
+        step
+        for step in plan
+        if (step.startswith("SCAN ") and not step.startswith("SCAN CONSTANT ROW") and not bounded)
+        or (" LIMIT " in upper and step.startswith("USE TEMP B-TREE FOR ORDER BY"))
+    ]
+
+
+def next_page(client, url, headers, response, **params):
+    return client.get(url, headers=headers, params={**params, "cursor": response.headers["X-Next-Cursor"]})
+
+
+def run_scenario(client, headers, seeded):
+    api = "/api/v1"
+    yield "GET /users/me", client.get(f"{api}/users/me", headers=headers)
+    response = client.get(f"{api}/users/user/get/all", headers=headers, params={"limit": 20})
+    yield "GET /users/user/get/all", response
+    yield "GET /users/user/get/all?cursor", next_page(client, f"{api}/users/user/get/all", headers, response, limit=20)
+    yield "GET /users/user/get/{id}", client.get(f"{api}/users/user/get/{seeded['user_id']}", headers=headers)
+    yield "PATCH /users/user/deactivate/{id}", client.patch(f"{api}/users/user/deactivate/{seeded['user_id']}", headers=headers)
+    yield "PATCH /users/user/activate/{id}", client.patch(f"{api}/users/user/activate/{seeded['user_id']}", headers=headers)
+    yield "PATCH /users/user/update/{id}", client.patch(
+        f"{api}/users/user/update/{seeded['user_id']}", headers=headers, json={"full_name": "Тест"}
+    )
+
+    response = client.post(
+        f"{api}/auth/users/register",
+        headers=headers,
+        json={"email": "new@example.com", "username": "new-user", "password": "new-password"},
+    )
+    yield "POST /auth/users/register", response
+    yield "DELETE /users/user/delete/{id}", client.delete(f"{api}/users/user/delete/{response.json()['id']}", headers=headers)
+
+    response = client.post(
+        f"{api}/responses/response/create",
+        headers=headers,
+        json={"title": "План", "body": "Проверка плана запросов", "send_response": True},
+    )
+    yield "POST /responses/response/create", response
+    template_id = response.json()["id"]
+
+    response = client.get(f"{api}/responses/response/all", headers=headers)
+    yield "GET /responses/response/all", response
+    yield "GET /responses/response/all?cursor", next_page(client, f"{api}/responses/response/all", headers, response)
+    yield "GET /responses/response/{id}", client.get(f"{api}/responses/response/{template_id}", headers=headers)
+    yield "PUT /responses/response/{id}", client.put(
+        f"{api}/responses/response/{template_id}", headers=headers, json={"title": "План 2"}
+    )
+
+    response = client.post(
+        f"{api}/responses/response/attach",
+        headers=headers,
+        json={"email_uid": "42", "response_template_id": template_id, "email_from": "client@example.com"},
+    )
+    yield "POST /responses/response/attach", response
+    attachment_id = response.json()["id"]
+
+    yield "GET /responses/response/attachments/email/{uid}", client.get(
+        f"{api}/responses/response/attachments/email/42", headers=headers
+    )
+    yield "GET /responses/response/attachments/template/{id}", client.get(
+        f"{api}/responses/response/attachments/template/{seeded['template_id']}", headers=headers
+    )
+    response = client.get(f"{api}/responses/response/attachments/all", headers=headers)
+    yield "GET /responses/response/attachments/all", response
+    yield "GET /responses/response/attachments/all?cursor", next_page(
+        client, f"{api}/responses/response/attachments/all", headers, response
+    )
+
+    response = client.get(f"{api}/responses/sent-emails/all", headers=headers)
+    yield "GET /responses/sent-emails/all", response
+    sent_email_id = response.json()[0]["id"]
+    yield "GET /responses/sent-emails/all?cursor", next_page(
+        client, f"{api}/responses/sent-emails/all", headers, response
+    )
+
+    response = client.get(f"{api}/responses/sent-emails/all", headers=headers, params={"success_only": True})
+    yield "GET /responses/sent-emails/all?success_only", response
+    yield "GET /responses/sent-emails/all?success_only&cursor", next_page(
+        client, f"{api}/responses/sent-emails/all", headers, response, success_only=True
+    )
+    yield "GET /responses/sent-emails/stats", client.get(f"{api}/responses/sent-emails/stats", headers=headers)
+    yield "GET /responses/sent-emails/{id}", client.get(f"{api}/responses/sent-emails/{sent_email_id}", headers=headers)
+    yield "GET /analytics/sent-emails/timeseries", client.get(
+        f"{api}/analytics/sent-emails/timeseries", headers=headers, params={"group_by": "template"}
+    )
+    yield "DELETE /responses/response/attachment/{id}", client.delete(
+        f"{api}/responses/response/attachment/{attachment_id}", headers=headers
+    )
+    yield "DELETE /responses/response/{id}", client.delete(f"{api}/responses/response/{template_id}", headers=headers)
+
+
+def test_endpoint_queries_do_not_full_scan(client, auth_headers, seeded, captured_statements):
+    failures = []
+    checked = 0
+
+    for endpoint, response in run_scenario(client, auth_headers, seeded):
+        assert response.status_code < 400, f"{endpoint}: {response.status_code} {response.text}"
+
+        for statement, parameters in captured_statements:
+            plan = explain(statement, parameters)
+            checked += 1
+            for step in full_scans(statement, plan):
+                failures.append(f"{endpoint}: {step}\n    {' '.join(statement.split())}")
+        captured_statements.clear()
+
+    assert checked > 0
+    assert not failures, "Полный просмотр таблицы в запросах эндпоинтов:\n" + "\n".join(failures)
@@ -0,0 +1,107 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.middleware import rate_limit
+from app.middleware.rate_limit import MemoryRateLimitBackend, RateLimitMiddleware, evaluate_window
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [6000.0]
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def limited_app(clock):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/fetch")
+    async def fetch():
+        return {}
+
+    @app.get("/health")
+    async def health():
+        return {}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=MemoryRateLimitBackend(max_keys=100),
+        limit_per_minute=3,
+        route_limits={"/fetch": 1, "/health": 0},
+        ip_multiplier=2,
+    )
+    return app
+
+
+@pytest.fixture
+def limited_client(limited_app):
+    return TestClient(limited_app)
+
+
+def bearer(username: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+
+
+def test_limit_applies_per_route_template(limited_client):
+    statuses = [limited_client.get(f"/items/{i}").status_code for i in range(4)]
+    assert statuses == [200, 200, 200, 429]
+    assert limited_client.get("/fetch").status_code == 200
+    assert limited_client.get("/fetch").status_code == 429
+    assert all(limited_client.get("/health").status_code == 200 for _ in range(5))
+
+
+def test_rejection_headers(limited_client):
+    response = limited_client.get("/fetch")
+    assert response.headers["X-RateLimit-Limit"] == "1"
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+
+    response = limited_client.get("/fetch")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "120"
+    assert response.headers["X-RateLimit-Reset"] == "60"
+
+
+def test_users_are_limited_separately(limited_client):
+    assert limited_client.get("/fetch", headers=bearer("first")).status_code == 200
+    assert limited_client.get("/fetch", headers=bearer("first")).status_code == 429
+    assert limited_client.get("/fetch", headers=bearer("second")).status_code == 200
+
+
+def test_ip_limit_applies_across_tokens(limited_client):
+    # Бюджет IP для запросов с токеном: 1 * ip_multiplier = 2 запроса.
+    assert limited_client.get("/fetch", headers=bearer("first")).status_code == 200
+    assert limited_client.get("/fetch", headers=bearer("second")).status_code == 200
+    response = limited_client.get("/fetch", headers=bearer("third"))
+    assert response.status_code == 429
+    assert response.headers["X-RateLimit-Limit"] == "2"
+
+
+def test_user_limit_applies_across_ips(limited_app):
+    first = TestClient(limited_app, client=("10.0.0.1", 50000))
+    second = TestClient(limited_app, client=("10.0.0.2", 50000))
+
+    assert first.get("/fetch", headers=bearer("roaming")).status_code == 200
+    assert second.get("/fetch", headers=bearer("roaming")).status_code == 429
+    assert second.get("/fetch", headers=bearer("other")).status_code == 200
+
+
+def test_window_slides(limited_client, clock):
+    assert all(limited_client.get("/items/1").status_code == 200 for _ in range(3))
+    clock[0] += 60
+    assert limited_client.get("/items/1").status_code == 429
+    clock[0] += 40
+    assert limited_client.get("/items/1").status_code == 200
+
+
+def test_evaluate_window_weights_previous_window():
+    assert evaluate_window(previous=10, current=5, elapsed=30, limit=10, window=60).allowed
+    rejected = evaluate_window(previous=10, current=6, elapsed=30, limit=10, window=60)
+    assert not rejected.allowed
+    assert rejected.retry_after == pytest.approx(6)
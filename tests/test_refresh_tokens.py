@@ -0,0 +1,130 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.models import RefreshToken, User
+from app.services import background_jobs
+from helpers import ROOT_DIR
+
+API = "/api/v1/auth"
+PASSWORD = "refresh-password"
+
+
+@pytest.fixture
+def session_user(create_user):
+    return create_user("refresh", password=PASSWORD)
+
+
+def login(client) -> dict:
+    response = client.post(f"{API}/login", data={"username": "refresh", "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def refresh(client, refresh_token: str):
+    return client.post(f"{API}/refresh", json={"refresh_token": refresh_token})
+
+
+def test_refresh_rotates_tokens(client, session_user):
+    tokens = login(client)
+
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200, response.text
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    me = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.json()["username"] == "refresh"
+
+
+def test_reused_token_revokes_the_session(client, session_user):
+    tokens = login(client)
+    other_session = login(client)
+    rotated = refresh(client, tokens["refresh_token"]).json()
+
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+    assert refresh(client, other_session["refresh_token"]).status_code == 200
+
+
+def test_logout_revokes_token(client, session_user):
+    tokens = login(client)
+
+    assert client.post(f"{API}/logout", json={"refresh_token": tokens["refresh_token"]}).status_code == 204
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+    assert refresh(client, "unknown").status_code == 401
+
+
+def test_password_change_and_deactivation_block_refresh(client, auth_headers, session_user):
+    tokens = login(client)
+    client.patch(f"/api/v1/users/user/update/{session_user.id}", headers=auth_headers, json={"password": "new-password"})
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+    tokens = client.post(f"{API}/login", data={"username": "refresh", "password": "new-password"}).json()
+    client.patch(f"/api/v1/users/user/deactivate/{session_user.id}", headers=auth_headers)
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+@pytest.fixture
+def purge_db(tmp_path, monkeypatch):
+    path = tmp_path / "tokens.db"
+    config = Config(os.path.join(ROOT_DIR, "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+    command.upgrade(config, "head")
+
+    engine = create_engine(f"sqlite:///{path}")
+    now = datetime.now(timezone.utc)
+    with engine.begin() as connection:
+        user_id = connection.execute(
+            insert(User).values(email="tokens@example.com", username="tokens", hashed_password="x", is_active=True)
+        ).inserted_primary_key[0]
+        connection.execute(
+            insert(RefreshToken),
+            [
+                {"user_id": user_id, "token_hash": name, "family_id": "family", "expires_at": now + timedelta(days=days)}
+                for name, days in [("expired", -1), ("active", 1)]
+            ],
+        )
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    monkeypatch.setattr(background_jobs, "AsyncSessionLocal", async_sessionmaker(async_engine, expire_on_commit=False))
+    yield engine
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+
+def test_expired_tokens_are_purged_without_retention(purge_db, monkeypatch):
+    monkeypatch.setattr(settings, "RETENTION_ENABLED", False)
+    scheduled = []
+
+    def run_periodically(job, interval_seconds):
+        scheduled.append(job)
+        return asyncio.sleep(0)
+
+    async def start():
+        await asyncio.gather(*background_jobs.start_background_jobs())
+
+    monkeypatch.setattr(background_jobs, "run_periodically", run_periodically)
+    asyncio.run(start())
+    assert background_jobs.purge_refresh_tokens in scheduled
+    assert background_jobs.archive_expired_rows not in scheduled
+
+    assert asyncio.run(background_jobs.purge_refresh_tokens()) == 1
+    with purge_db.connect() as connection:
+        assert connection.scalars(select(RefreshToken.token_hash)).all() == ["active"]
+
+
+def test_purge_uses_expires_at_index(purge_db):
+    with purge_db.connect() as connection:
+        plan = connection.execute(
+            text("EXPLAIN QUERY PLAN DELETE FROM refresh_tokens WHERE expires_at < :now"),
+            {"now": datetime.now(timezone.utc)},
+        ).all()
+    assert any("ix_refresh_tokens_expires_at" in row[-1] for row in plan), plan
@@ -0,0 +1,221 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services import background_jobs
+from app.services.job_lease_service import JobLeaseService
+from app.models import (
+    EmailResponseAttachment, ResponseTemplate, SentEmail, SentEmailBody, SentEmailCounter, User,
+)
+from app.models.sent_email import insert_sent_email_body
+from app.services.retention_service import (
+    ATTACHMENTS_ARCHIVE,
+    SENT_EMAILS_ARCHIVE,
+    ArchiveStore,
+    RetentionService,
+    read_archive,
+)
+from helpers import ROOT_DIR
+
+NOW = datetime(2026, 6, 15, 12, 0, tzinfo=timezone.utc)
+CUTOFF = NOW - timedelta(days=30)
+OLD_SENT_EMAILS = 25
+NEW_SENT_EMAILS = 5
+
+
+@pytest.fixture
+def retention_db(tmp_path):
+    url = f"sqlite:///{tmp_path / 'retention.db'}"
+    config = Config(os.path.join(ROOT_DIR, "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        user_id = connection.execute(
+            insert(User).values(email="old@example.com", username="old", hashed_password="x", is_active=True)
+        ).inserted_primary_key[0]
+        template_id = connection.execute(
+            insert(ResponseTemplate).values(user_id=user_id, title="Шаблон", body="Текст")
+        ).inserted_primary_key[0]
+        old_attachment, new_attachment = [
+            connection.execute(
+                insert(EmailResponseAttachment).values(
+                    user_id=user_id, email_uid=str(i), response_template_id=template_id, attached_at=attached_at
+                )
+            ).inserted_primary_key[0]
+            for i, attached_at in enumerate([CUTOFF - timedelta(days=1), CUTOFF + timedelta(days=1)])
+        ]
+        shared_body = insert_sent_email_body(connection, "Общий текст")
+        old_body = insert_sent_email_body(connection, "Только в архиве " * 30)
+        connection.execute(
+            insert(SentEmail),
+            [
+                {
+                    "user_id": user_id,
+                    "attachment_id": old_attachment,
+                    "to_email": "client@example.com",
+                    "subject": "Re: Вопрос",
+                    "body_hash": shared_body if i % 2 else old_body,
+                    "success": bool(i % 5),
+                    "sent_at": CUTOFF - timedelta(days=40) + timedelta(days=i),
+                }
+                for i in range(OLD_SENT_EMAILS)
+            ]
+            + [
+                {
+                    "user_id": user_id,
+                    "attachment_id": old_attachment,
+                    "to_email": "client@example.com",
+                    "subject": "Re: Вопрос",
+                    "body_hash": shared_body,
+                    "success": True,
+                    "sent_at": CUTOFF + timedelta(days=i),
+                }
+                for i in range(NEW_SENT_EMAILS)
+            ],
+        )
+
+    with Session(engine) as session:
+        yield session, user_id, new_attachment
+    engine.dispose()
+
+
+def test_expired_rows_move_to_archive(retention_db, tmp_path):
+    session, user_id, new_attachment = retention_db
+    store = ArchiveStore(str(tmp_path / "archive"))
+    service = RetentionService(session, store=store, batch_size=7)
+
+    archived = {
+        SENT_EMAILS_ARCHIVE: service.archive_sent_emails(CUTOFF),
+        ATTACHMENTS_ARCHIVE: service.archive_attachments(CUTOFF),
+    }
+    service.compact()
+
+    assert archived == {SENT_EMAILS_ARCHIVE: OLD_SENT_EMAILS, ATTACHMENTS_ARCHIVE: 1}
+    assert session.scalar(select(func.count(SentEmail.id))) == NEW_SENT_EMAILS
+    assert session.scalar(select(func.count(SentEmail.id)).where(SentEmail.attachment_id.is_not(None))) == 0
+    assert session.scalars(select(EmailResponseAttachment.id)).all() == [new_attachment]
+    assert session.scalars(select(SentEmailBody.hash)).all() == [SentEmailBody.hash_text("Общий текст")]
+
+    counter = session.get(SentEmailCounter, user_id)
+    assert counter.total_sent == OLD_SENT_EMAILS + NEW_SENT_EMAILS
+    assert counter.failed == OLD_SENT_EMAILS // 5
+
+    records = read_archive(SENT_EMAILS_ARCHIVE, "sent_at", user_id=user_id, limit=1000, store=store)
+    assert len(records) == OLD_SENT_EMAILS
+    assert records[0]["body"] == "Только в архиве " * 30
+    assert records[1]["body"] == "Общий текст"
+
+    first_ten_days = read_archive(
+        SENT_EMAILS_ARCHIVE, "sent_at", start=CUTOFF - timedelta(days=40), end=CUTOFF - timedelta(days=30), store=store
+    )
+    assert [record["id"] for record in first_ten_days] == [record["id"] for record in records[:10]]
+
+
+def test_archive_is_read_once_per_row(retention_db, tmp_path):
+    session, user_id, _ = retention_db
+    store = ArchiveStore(str(tmp_path / "archive"))
+    RetentionService(session, store=store).archive_sent_emails(CUTOFF)
+
+    month = store.months(SENT_EMAILS_ARCHIVE, None, None)[0]
+    store.append(SENT_EMAILS_ARCHIVE, month, list(store.read(SENT_EMAILS_ARCHIVE, month)))
+
+    records = read_archive(SENT_EMAILS_ARCHIVE, "sent_at", limit=1000, store=store)
+    assert len(records) == len({record["id"] for record in records}) == OLD_SENT_EMAILS
+
+
+def test_concurrent_appends_keep_archive_readable(tmp_path):
+    store = ArchiveStore(str(tmp_path / "archive"))
+
+    # Тексты плохо сжимаются, поэтому каждый пакет пишется в файл несколькими кусками.
+    body = os.urandom(32 * 1024).hex()
+
+    def append(worker):
+        for batch in range(5):
+            store.append(
+                SENT_EMAILS_ARCHIVE, "2026-05", [{"id": worker * 100 + batch * 10 + i, "body": body} for i in range(10)]
+            )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(append, range(8)))
+
+    records = list(store.read(SENT_EMAILS_ARCHIVE, "2026-05"))
+    assert sorted(record["id"] for record in records) == sorted(
+        worker * 100 + batch * 10 + i for worker in range(8) for batch in range(5) for i in range(10)
+    )
+
+
+def test_second_concurrent_archiving_run_skips(migrated_db, monkeypatch):
+    started, finish = threading.Event(), threading.Event()
+    runs = []
+
+    def slow_run(self, now=None):
+        runs.append(now)
+        started.set()
+        finish.wait(5)
+        return {SENT_EMAILS_ARCHIVE: 0, ATTACHMENTS_ARCHIVE: 0}
+
+    monkeypatch.setattr(RetentionService, "run", slow_run)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        first = executor.submit(background_jobs.archive_expired_rows)
+        assert started.wait(5)
+        assert background_jobs.archive_expired_rows() == {}
+        finish.set()
+        assert first.result() == {SENT_EMAILS_ARCHIVE: 0, ATTACHMENTS_ARCHIVE: 0}
+    assert len(runs) == 1
+
+    # Аренда освобождается после запуска: следующий запуск выполняется.
+    assert background_jobs.archive_expired_rows() == {SENT_EMAILS_ARCHIVE: 0, ATTACHMENTS_ARCHIVE: 0}
+    assert len(runs) == 2
+
+
+def test_expired_lease_is_taken_over(migrated_db):
+    with SessionLocal() as db:
+        leases = JobLeaseService(db)
+        crashed = leases.acquire("lease-test", ttl_seconds=-1)
+        assert crashed is not None
+
+        owner = leases.acquire("lease-test", ttl_seconds=60)
+        assert owner not in (None, crashed)
+        assert leases.acquire("lease-test", ttl_seconds=60) is None
+
+        leases.release("lease-test", crashed)
+        assert leases.acquire("lease-test", ttl_seconds=60) is None
+        leases.release("lease-test", owner)
+        owner = leases.acquire("lease-test", ttl_seconds=60)
+        assert owner is not None
+        leases.release("lease-test", owner)
+
+
+def test_rows_not_yet_rolled_up_are_kept(retention_db, tmp_path, monkeypatch):
+    session, _, _ = retention_db
+    monkeypatch.setattr(settings, "ANALYTICS_ROLLUP_ENABLED", True)
+
+    service = RetentionService(session, store=ArchiveStore(str(tmp_path / "archive")))
+    assert service.archive_sent_emails(CUTOFF) == 0
+
+
+def test_archive_endpoint(client, auth_headers, retention_db, tmp_path, monkeypatch):
+    session, user_id, _ = retention_db
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    RetentionService(session).archive_sent_emails(CUTOFF)
+
+    response = client.get(
+        "/api/v1/archive/sent-emails", headers=auth_headers, params={"user_id": user_id, "limit": 10, "skip": 10}
+    )
+    assert response.status_code == 200, response.text
+    assert [email["id"] for email in response.json()] == list(range(11, 21))
+
+    response = client.get("/api/v1/archive/attachments", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == []
@@ -0,0 +1,71 @@
+import logging
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core import codecs
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.models import SentEmail, SentEmailBody
+from app.models.sent_email import insert_sent_email_body
+
+
+@pytest.fixture
+def body_codec(migrated_db, monkeypatch):
+    def use(codec: str):
+        monkeypatch.setattr(settings, "SENT_EMAIL_BODY_CODEC", codec)
+
+    codecs.writable.cache_clear()
+    yield use
+    codecs.writable.cache_clear()
+
+
+def stored_body(body_hash: str) -> SentEmailBody:
+    with SessionLocal() as db:
+        body = db.get(SentEmailBody, body_hash)
+        body.text
+        return body
+
+
+@pytest.mark.parametrize("codec", sorted(codecs.CODECS))
+def test_body_round_trip(body_codec, codec):
+    body_codec(codec)
+    text = f"Здравствуйте! Ответ в кодеке {codec}. " * 20
+
+    with engine.begin() as connection:
+        body_hash = insert_sent_email_body(connection, text)
+
+    body = stored_body(body_hash)
+    assert body.codec == codec
+    assert body.original_size == len(text.encode("utf-8"))
+    assert body.text == text
+
+
+def test_unavailable_codec_falls_back_to_zlib(body_codec, monkeypatch, caplog):
+    monkeypatch.delitem(codecs.CODECS, "zstd", raising=False)
+    body_codec("zstd")
+    text = "Письмо без zstandard. " * 30
+
+    with caplog.at_level(logging.WARNING, logger="app.core.codecs"):
+        with engine.begin() as connection:
+            body_hash = insert_sent_email_body(connection, text)
+            insert_sent_email_body(connection, text + " Еще одно.")
+
+    body = stored_body(body_hash)
+    assert body.codec == "zlib"
+    assert body.text == text
+    assert caplog.text.count("недоступен") == 1
+
+
+def test_same_body_is_stored_once(superuser):
+    text = "Одинаковый ответ на разные письма. " * 10
+    with SessionLocal() as db:
+        for recipient in ("first@example.com", "second@example.com", "third@example.com"):
+            db.add(SentEmail(user_id=superuser, to_email=recipient, subject="Re", body=text, success=True))
+        db.commit()
+
+    with SessionLocal() as db:
+        body_hash = SentEmailBody.hash_text(text)
+        assert db.scalar(select(func.count()).select_from(SentEmailBody).where(SentEmailBody.hash == body_hash)) == 1
+        sent = db.scalars(select(SentEmail).where(SentEmail.body_hash == body_hash)).all()
+        assert [email.body for email in sent] == [text] * 3
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.core.database import SessionLocal, engine
+from app.models import SentEmail
+from app.models.sent_email import SentEmailCounter, insert_sent_email_body, sent_email_counter_seed
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def stats_user(create_user):
+    user = create_user("stats")
+    return user.id, user.headers
+
+
+def insert_history(user_id: int, successes):
+    # Письма, записанные в обход ORM: счетчик о них не знает, как о письмах до появления счетчиков.
+    with engine.begin() as connection:
+        body_hash = insert_sent_email_body(connection, "Текст")
+        connection.execute(
+            insert(SentEmail),
+            [
+                {"user_id": user_id, "to_email": "client@example.com", "subject": "Re", "body_hash": body_hash, "success": success}
+                for success in successes
+            ],
+        )
+
+
+def send(user_id: int, success: bool):
+    with SessionLocal() as db:
+        db.add(SentEmail(user_id=user_id, to_email="client@example.com", subject="Re", body="Текст", success=success))
+        db.commit()
+
+
+def actual_totals(user_id: int) -> dict:
+    with SessionLocal() as db:
+        total, successful = db.execute(
+            select(func.count(SentEmail.id), func.count(SentEmail.id).filter(SentEmail.success)).where(SentEmail.user_id == user_id)
+        ).one()
+    return {"total_sent": total, "successful": successful, "failed": total - successful}
+
+
+def counter_totals(user_id: int) -> dict:
+    with SessionLocal() as db:
+        counter = db.get(SentEmailCounter, user_id)
+        return {"total_sent": counter.total_sent, "successful": counter.successful, "failed": counter.failed}
+
+
+def test_first_send_seeds_counter_from_history(stats_user):
+    user_id, _ = stats_user
+    insert_history(user_id, [True, False, True])
+
+    send(user_id, False)
+
+    assert counter_totals(user_id) == actual_totals(user_id) == {"total_sent": 4, "successful": 2, "failed": 2}
+
+
+def test_stats_totals_match_count_after_sends(client, stats_user):
+    user_id, headers = stats_user
+    insert_history(user_id, [True, False])
+
+    stats = client.get(f"{API}/responses/sent-emails/stats", headers=headers).json()
+    assert {key: stats[key] for key in ("total_sent", "successful", "failed")} == actual_totals(user_id)
+
+    for success in (True, True, False, True, False):
+        send(user_id, success)
+
+    stats = client.get(f"{API}/responses/sent-emails/stats", headers=headers).json()
+    assert {key: stats[key] for key in ("total_sent", "successful", "failed")} == actual_totals(user_id)
+    assert stats["total_sent"] == 7
+
+
+def test_seed_skips_existing_counter(stats_user):
+    user_id, _ = stats_user
+    with engine.begin() as connection:
+        assert connection.execute(sent_email_counter_seed(connection.dialect.name, user_id)).rowcount == 1
+        assert connection.execute(sent_email_counter_seed(connection.dialect.name, user_id)).rowcount == 0
+    assert counter_totals(user_id) == {"total_sent": 0, "successful": 0, "failed": 0}
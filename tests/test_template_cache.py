@@ -0,0 +1,171 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import event, select, update
+
+from app.core import cache
+from app.core.cache import MISSING, LocalInvalidationChannel, TTLCache
+from app.core.database import SessionLocal, async_engine, engine
+from app.models import ResponseTemplate, SentEmail
+from app.schemas.response_template import ResponseTemplateResponse
+from app.services.template_cache import ResponseTemplateCache
+
+API = "/api/v1/responses"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def template_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "response_templates" in statement:
+            statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    lru = TTLCache(max_size=2, ttl_seconds=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+
+    assert lru.get("a") == 1
+    assert lru.get("b") is MISSING
+    assert lru.get("c") == 3
+
+
+def test_ttl_cache_expires_entries(clock):
+    lru = TTLCache(max_size=10, ttl_seconds=30)
+    lru.set("default", 1)
+    lru.set("short", 2, ttl_seconds=5)
+
+    clock[0] += 10
+    assert lru.get("short") is MISSING
+    assert lru.get("default") == 1
+
+    clock[0] += 30
+    assert lru.get("default") is MISSING
+    assert len(lru) == 0
+
+
+def test_invalidation_during_load_is_not_cached():
+    channel = LocalInvalidationChannel()
+    template_cache = ResponseTemplateCache(channel, max_size=10, ttl_seconds=60)
+    row = ResponseTemplateResponse(id=1, user_id=1, title="Старый", body="Текст", created_at="2026-01-01T00:00:00")
+
+    async def load_while_updated():
+        template_cache.invalidate(1)
+        return [row]
+
+    asyncio.run(template_cache.get_page("page", load_while_updated))
+    assert template_cache.pages.get("page") is MISSING
+    assert template_cache.templates.get(1) is MISSING
+
+
+def test_writes_invalidate_cached_template(client, auth_headers):
+    template = client.post(
+        f"{API}/response/create", headers=auth_headers, json={"title": "Кэш", "body": "Текст"}
+    ).json()
+    assert client.get(f"{API}/response/{template['id']}", headers=auth_headers).json()["title"] == "Кэш"
+
+    client.put(f"{API}/response/{template['id']}", headers=auth_headers, json={"title": "Кэш 2"})
+    assert client.get(f"{API}/response/{template['id']}", headers=auth_headers).json()["title"] == "Кэш 2"
+
+    client.delete(f"{API}/response/{template['id']}", headers=auth_headers)
+    assert client.get(f"{API}/response/{template['id']}", headers=auth_headers).status_code == 404
+
+
+def test_attach_reads_template_from_cache(client, auth_headers, template_statements):
+    template = client.post(
+        f"{API}/response/create", headers=auth_headers, json={"title": "Горячий путь", "body": "Текст"}
+    ).json()
+    client.get(f"{API}/response/{template['id']}", headers=auth_headers)
+    template_statements.clear()
+
+    response = client.post(
+        f"{API}/response/attach",
+        headers=auth_headers,
+        json={"email_uid": "cache-hot-path", "response_template_id": template["id"]},
+    )
+
+    assert response.status_code == 201, response.text
+    assert response.json()["response_template"]["title"] == "Горячий путь"
+    assert template_statements == []
+
+
+def test_attach_sends_current_template_despite_stale_cache(client, auth_headers, superuser):
+    template = client.post(
+        f"{API}/response/create",
+        headers=auth_headers,
+        json={"title": "Старая тема", "body": "Старый текст", "send_response": True},
+    ).json()
+    client.get(f"{API}/response/{template['id']}", headers=auth_headers)
+    # Изменение, сделанное другим воркером: кэш этого процесса о нем не знает.
+    with engine.begin() as connection:
+        connection.execute(
+            update(ResponseTemplate).where(ResponseTemplate.id == template["id"]).values(title="Новая тема", body="Новый текст")
+        )
+    assert client.get(f"{API}/response/{template['id']}", headers=auth_headers).json()["title"] == "Старая тема"
+
+    response = client.post(
+        f"{API}/response/attach",
+        headers=auth_headers,
+        json={"email_uid": "stale-cache", "response_template_id": template["id"]},
+    )
+
+    assert response.status_code == 201, response.text
+    assert response.json()["response_template"]["title"] == "Новая тема"
+    with SessionLocal() as db:
+        sent_email = db.scalars(select(SentEmail).where(SentEmail.attachment_id == response.json()["id"])).one()
+        assert (sent_email.subject, sent_email.body) == ("Новая тема", "Новый текст")
+
+
+class SlowRedis:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        time.sleep(0.3)
+        self.published.append(message)
+
+    def close(self):
+        pass
+
+
+def test_redis_publish_does_not_block_the_caller():
+    pytest.importorskip("redis")
+    channel = cache.RedisInvalidationChannel("redis://127.0.0.1:1/0")
+    channel._redis = SlowRedis()
+    evicted = []
+    channel.subscribe("topic", evicted.append)
+
+    started = time.monotonic()
+    channel.publish("topic", 1)
+    channel.publish("topic", 2)
+
+    assert time.monotonic() - started < 0.1
+    assert evicted == [1, 2]
+    channel.close()
+    assert channel._redis.published == ['["topic", 1]', '["topic", 2]']
+
+
+def test_unreachable_redis_does_not_break_startup(caplog):
+    pytest.importorskip("redis")
+    channel = cache.RedisInvalidationChannel("redis://127.0.0.1:1/0")
+
+    channel.start()
+    channel.close()
+
+    assert "недоступен" in caplog.text
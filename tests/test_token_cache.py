@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+import pytest
+
+from app.core import cache, security
+from app.core.security import create_access_token, decode_token
+
+
+@pytest.fixture
+def jwt_decodes(monkeypatch):
+    calls = []
+    original = security.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+    security.verified_tokens.clear()
+    return calls
+
+
+def test_repeated_token_is_verified_once(jwt_decodes):
+    token = create_access_token({"sub": "cached"})
+
+    assert decode_token(token)["sub"] == "cached"
+    decode_token(token)["sub"] = "changed"
+    assert decode_token(token)["sub"] == "cached"
+    assert len(jwt_decodes) == 1
+
+
+def test_invalid_token_is_not_cached(jwt_decodes):
+    token = create_access_token({"sub": "cached"}) + "x"
+
+    assert decode_token(token) is None
+    assert decode_token(token) is None
+    assert len(jwt_decodes) == 2
+
+
+def test_cached_token_expires_with_exp(jwt_decodes, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    token = create_access_token({"sub": "cached"}, expires_delta=timedelta(seconds=60))
+
+    decode_token(token)
+    now[0] += 59
+    decode_token(token)
+    assert len(jwt_decodes) == 1
+
+    now[0] += 2
+    decode_token(token)
+    assert len(jwt_decodes) == 2
@@ -0,0 +1,45 @@
+from sqlalchemy import delete, select
+
+from app.core.database import SessionLocal
+from app.core.vault import CredentialVault
+from app.models.user import User
+from app.services.credential_rotation_service import CredentialRotationService
+
+
+def make_vault(*keys) -> CredentialVault:
+    return CredentialVault(list(keys), cache_max_size=10, cache_ttl_seconds=60)
+
+
+def test_decrypted_credentials_are_cached():
+    vault = make_vault("key")
+    encrypted = vault.encrypt("mailbox-password")
+
+    assert vault.decrypt(encrypted) == "mailbox-password"
+    assert vault.credentials.get(encrypted) == "mailbox-password"
+    assert vault.decrypt(encrypted[:-4] + "AAAA") is None
+    assert vault.encrypt("") is None and vault.decrypt(None) is None
+
+
+def test_old_key_still_decrypts_until_rotated():
+    old_vault = make_vault("old")
+    encrypted = old_vault.encrypt("mailbox-password")
+
+    vault = make_vault("new", "old")
+    assert vault.decrypt(encrypted) == "mailbox-password"
+    assert vault.needs_rotation(encrypted)
+    assert not vault.needs_rotation(vault.rotate(encrypted))
+
+
+def test_rotation_reencrypts_stored_passwords(migrated_db):
+    encrypted = make_vault("old").encrypt("mailbox-password")
+    with SessionLocal() as db:
+        db.add(User(email="rotation@example.com", username="rotation", hashed_password="x", email_password=encrypted))
+        db.commit()
+
+    with SessionLocal() as db:
+        assert CredentialRotationService(db, make_vault("new", "old")).run() == 1
+        stored = db.scalar(select(User.email_password).where(User.username == "rotation"))
+        db.execute(delete(User).where(User.username == "rotation"))
+        db.commit()
+
+    assert make_vault("new").decrypt(stored) == "mailbox-password"